@@ -4,20 +4,41 @@
 Usage:
   python3 ~/skills/deep-research/brave_search.py search "query here"
   python3 ~/skills/deep-research/brave_search.py fetch "https://example.com"
+  python3 ~/skills/deep-research/brave_search.py search-many "query one" "query two"
 
 Requires BRAVE_SEARCH_API_KEY in environment or in a .env file.
+If selectolax is installed, fetch uses it to extract page text; otherwise it
+falls back to regex tag stripping. Fetched pages are cached for 24 hours in
+~/.cache/skills/brave_fetch/.
 """
 
+import codecs
+import contextlib
+import gzip
+import hashlib
 import json
 import os
 import pathlib
 import re
 import sys
+import tempfile
+import time
+import urllib.error
 import urllib.parse
+import urllib.request
+import zlib
+from html import unescape
+
+
+_ENV_PATH_CACHE = pathlib.Path.home() / ".cache" / "skills" / "brave_env_path"
 
 
 def _load_env():
-    """Load .env from several candidate locations until BRAVE_SEARCH_API_KEY is found."""
+    """Load .env from several candidate locations until BRAVE_SEARCH_API_KEY is found.
+
+    The winning path is remembered in _ENV_PATH_CACHE so later runs can load it
+    directly instead of probing every candidate again.
+    """
     if os.environ.get("BRAVE_SEARCH_API_KEY"):
         return  # Already set in environment
 
@@ -26,35 +47,147 @@ def _load_env():
     except ImportError:
         return  # No dotenv; rely on env vars being set directly
 
+    try:
+        cached = pathlib.Path(_ENV_PATH_CACHE.read_text().strip())
+    except OSError:
+        cached = None
+    if cached is not None and cached.is_file():
+        load_dotenv(cached)
+        if os.environ.get("BRAVE_SEARCH_API_KEY"):
+            return
+
     # Candidate .env locations, tried in order
     candidates = [
         pathlib.Path.cwd() / ".env",
         pathlib.Path(__file__).resolve().parent / ".env",
         pathlib.Path.home() / ".env",
         pathlib.Path.home() / "claude" / ".env",
-        # WSL: project dir mounted from Windows
-        pathlib.Path("/mnt/c/Users") / os.environ.get("USER", "_") / "claude" / ".env",
     ]
+    # WSL: project dir mounted from Windows
+    if sys.platform == "linux" and os.path.isdir("/mnt/c"):
+        candidates.append(
+            pathlib.Path("/mnt/c/Users") / os.environ.get("USER", "_") / "claude" / ".env"
+        )
 
     for p in candidates:
         if p.is_file():
             load_dotenv(p)
             if os.environ.get("BRAVE_SEARCH_API_KEY"):
+                try:
+                    _ENV_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+                    _ENV_PATH_CACHE.write_text(str(p.resolve()))
+                except OSError:
+                    pass  # Cache is best-effort
                 return
 
 
 _load_env()
 
-import requests
+# requests (and its pooled Session) only pays off across many calls, so a
+# one-shot CLI run uses urllib and skips the requests import entirely.
+if __name__ != "__main__" or sys.argv[1:2] == ["search-many"]:
+    import requests
+    from requests.adapters import HTTPAdapter
+else:
+    requests = None
 
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None  # Fall back to regex stripping
 
-def search(query: str) -> None:
-    """Search Brave and print simplified JSON results."""
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to stdlib json
+
+_SESSION = None
+
+# fetch() stops downloading after this many raw bytes; the cleaned text is
+# capped at 15,000 chars anyway, so the rest of a large page is never needed.
+_FETCH_MAX_BYTES = 512 * 1024
+
+# Cleaned fetch() output is cached per URL; entries younger than the TTL are
+# served without a request, older ones are revalidated with ETag/Last-Modified.
+_FETCH_CACHE_DIR = pathlib.Path.home() / ".cache" / "skills" / "brave_fetch"
+_FETCH_CACHE_TTL = 24 * 60 * 60
+
+# fetch() strips markup only for HTML; a missing Content-Type is treated as HTML
+_HTML_CONTENT_TYPES = {"", "text/html", "application/xhtml+xml"}
+_JSON_CONTENT_TYPES = {"application/json", "text/json"}
+
+# Regex fallback for fetch() when selectolax is not installed
+_RE_SCRIPT = re.compile(r"<script[^>]*>.*?</script>", re.DOTALL | re.IGNORECASE)
+_RE_STYLE = re.compile(r"<style[^>]*>.*?</style>", re.DOTALL | re.IGNORECASE)
+_RE_TAG = re.compile(r"<[^>]+>")
+_RE_WS = re.compile(r"\s+")
+
+
+def _dumps(obj, indent: bool = True) -> str:
+    """Serialize to JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
+
+
+def _session() -> "requests.Session":
+    """Return a shared Session so repeated calls reuse keep-alive connections."""
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0)
+        _SESSION.mount("https://", adapter)
+        _SESSION.mount("http://", adapter)
+    return _SESSION
+
+
+@contextlib.contextmanager
+def _get(url: str, headers: dict, params: dict | None = None):
+    """GET a URL and yield (status, headers, body chunk iterator, charset).
+
+    Uses the pooled requests Session when requests is loaded, otherwise
+    urllib. HTTP errors are raised, except 304 which is yielded.
+    """
+    if requests is not None:
+        with _session().get(
+            url, params=params, headers=headers, timeout=30,
+            allow_redirects=True, stream=True,
+        ) as resp:
+            if resp.status_code != 304:
+                resp.raise_for_status()
+            # Only a declared charset, like urllib's get_content_charset();
+            # resp.encoding would guess ISO-8859-1 for any bare text/* type
+            content_type = resp.headers.get("Content-Type", "")
+            charset = (
+                requests.utils.get_encoding_from_headers(resp.headers)
+                if "charset=" in content_type.lower() else None
+            )
+            yield resp.status_code, resp.headers, resp.iter_content(8192), charset
+        return
+
+    if params:
+        url = f"{url}?{urllib.parse.urlencode(params)}"
+    try:
+        resp = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30)
+    except urllib.error.HTTPError as e:
+        if e.code != 304:
+            raise
+        resp = e
+    with resp:
+        chunks = iter(lambda: resp.read(8192), b"")
+        yield resp.status, resp.headers, chunks, resp.headers.get_content_charset()
+
+
+def _require_api_key() -> str:
     api_key = os.environ.get("BRAVE_SEARCH_API_KEY")
     if not api_key:
-        print(json.dumps({"error": "BRAVE_SEARCH_API_KEY not set"}))
+        print(_dumps({"error": "BRAVE_SEARCH_API_KEY not set"}, indent=False))
         sys.exit(1)
+    return api_key
+
 
+def _search_results(query: str, api_key: str) -> list[dict]:
+    """Query Brave and return the simplified web results."""
     url = "https://api.search.brave.com/res/v1/web/search"
     params = {"q": query, "count": 10}
     headers = {
@@ -62,9 +195,8 @@ def search(query: str) -> None:
         "X-Subscription-Token": api_key,
     }
 
-    resp = requests.get(url, params=params, headers=headers, timeout=30)
-    resp.raise_for_status()
-    data = resp.json()
+    with _get(url, headers, params) as (_, _, chunks, _):
+        data = json.loads(b"".join(chunks))
 
     results = []
     for item in data.get("web", {}).get("results", []):
@@ -74,34 +206,147 @@ def search(query: str) -> None:
             "description": item.get("description", ""),
             "age": item.get("age", ""),
         })
+    return results
+
 
-    print(json.dumps(results, indent=2))
+def search(query: str) -> None:
+    """Search Brave and print simplified JSON results."""
+    api_key = _require_api_key()
+    print(_dumps(_search_results(query, api_key)))
+
+
+def search_many(queries: list[str]) -> None:
+    """Run several searches over one pooled connection and print them as JSON."""
+    api_key = _require_api_key()
+    batch = [
+        {"query": query, "results": _search_results(query, api_key)}
+        for query in queries
+    ]
+    print(_dumps(batch))
+
+
+def _html_to_text(html: str) -> str:
+    """Strip tags, scripts and styles from HTML and return collapsed plain text."""
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        tree.strip_tags(["script", "style", "noscript"])
+        # selectolax decodes entities while parsing
+        text = tree.body.text(separator=" ") if tree.body else ""
+    else:
+        # Strip script and style tags with contents
+        html = _RE_SCRIPT.sub("", html)
+        html = _RE_STYLE.sub("", html)
+        # Strip all remaining HTML tags
+        text = _RE_TAG.sub(" ", html)
+        # Decode HTML entities (named and numeric)
+        text = unescape(text)
+    # Collapse whitespace
+    return _RE_WS.sub(" ", text).strip()
+
+
+def _fetch_cache_paths(url: str) -> tuple[pathlib.Path, pathlib.Path]:
+    """Return the (text, metadata) cache files for a URL."""
+    digest = hashlib.sha1(url.encode()).hexdigest()
+    shard = _FETCH_CACHE_DIR / digest[:2]
+    return shard / f"{digest}.txt.gz", shard / f"{digest}.meta.json"
+
+
+def _write_atomic(path: pathlib.Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _is_text_content_type(content_type: str) -> bool:
+    return (
+        content_type in _HTML_CONTENT_TYPES
+        or content_type in _JSON_CONTENT_TYPES
+        or content_type.endswith("+json")
+        or content_type.startswith("text/")
+    )
 
 
 def fetch(url: str) -> None:
     """Fetch a URL and print cleaned text content."""
+    text_path, meta_path = _fetch_cache_paths(url)
+    try:
+        cached = gzip.decompress(text_path.read_bytes()).decode("utf-8")
+        age = time.time() - text_path.stat().st_mtime
+    except (OSError, EOFError, UnicodeDecodeError, zlib.error):
+        cached = None  # Missing or corrupt entry; refetched and overwritten below
+    if cached is not None and age < _FETCH_CACHE_TTL:
+        print(cached)
+        return
+
     headers = {
         "User-Agent": "Mozilla/5.0 (compatible; ResearchBot/1.0)",
     }
-    resp = requests.get(url, headers=headers, timeout=30, allow_redirects=True)
-    resp.raise_for_status()
-    html = resp.text
-
-    # Strip script and style tags with contents
-    html = re.sub(r"<script[^>]*>.*?</script>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r"<style[^>]*>.*?</style>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    # Strip all remaining HTML tags
-    text = re.sub(r"<[^>]+>", " ", html)
-    # Collapse whitespace
-    text = re.sub(r"\s+", " ", text).strip()
-    # Decode common HTML entities
-    text = text.replace("&amp;", "&").replace("&lt;", "<").replace("&gt;", ">")
-    text = text.replace("&quot;", '"').replace("&#39;", "'").replace("&nbsp;", " ")
+    if cached is not None:
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    with _get(url, headers) as (status, resp_headers, body_chunks, charset):
+        if status == 304 and cached is not None:
+            os.utime(text_path)  # Revalidated; restart the TTL
+            print(cached)
+            return
+        content_type = resp_headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if not _is_text_content_type(content_type):
+            print(f"[unsupported content-type: {content_type}]")
+            sys.exit(1)
+
+        chunks = []
+        total = 0
+        for chunk in body_chunks:
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= _FETCH_MAX_BYTES:
+                break
+        encoding = "utf-8"
+        if charset:
+            try:
+                encoding = codecs.lookup(charset).name
+            except LookupError:
+                pass  # Unknown declared charset (e.g. "utf8mb4"); use utf-8
+        meta = {
+            "etag": resp_headers.get("ETag"),
+            "last_modified": resp_headers.get("Last-Modified"),
+        }
+
+    body = b"".join(chunks).decode(encoding, errors="replace")
+    if content_type in _HTML_CONTENT_TYPES:
+        text = _html_to_text(body)
+    elif content_type in _JSON_CONTENT_TYPES or content_type.endswith("+json"):
+        try:
+            text = _dumps(json.loads(body))
+        except ValueError:
+            text = body  # Truncated at the byte cap or not valid JSON
+    else:
+        # Plain text: nothing to strip, just collapse whitespace
+        text = _RE_WS.sub(" ", body).strip()
 
     # Limit output to ~15,000 chars
     if len(text) > 15000:
         text = text[:15000] + "\n\n[... truncated at 15,000 characters ...]"
 
+    try:
+        _write_atomic(meta_path, json.dumps(meta).encode())
+        _write_atomic(text_path, gzip.compress(text.encode("utf-8")))
+    except OSError:
+        pass  # Cache is best-effort
+
     print(text)
 
 
@@ -110,6 +355,7 @@ def main() -> None:
         print("Usage:")
         print('  python3 brave_search.py search "query"')
         print('  python3 brave_search.py fetch "https://example.com"')
+        print('  python3 brave_search.py search-many "query one" "query two"')
         sys.exit(1)
 
     mode = sys.argv[1]
@@ -119,8 +365,10 @@ def main() -> None:
         search(arg)
     elif mode == "fetch":
         fetch(arg)
+    elif mode == "search-many":
+        search_many(sys.argv[2:])
     else:
-        print(f"Unknown mode: {mode}. Use 'search' or 'fetch'.")
+        print(f"Unknown mode: {mode}. Use 'search', 'fetch' or 'search-many'.")
         sys.exit(1)
 
 
@@ -1,15 +1,29 @@
-"""Accept all tracked changes in a DOCX file using Microsoft Word.
+"""Accept all tracked changes in a DOCX file.
+
+Revisions are accepted by rewriting the WordprocessingML parts directly with
+lxml. Microsoft Word is only used as a fallback when lxml is unavailable or a
+part cannot be parsed:
 
 macOS: AppleScript via osascript
 Windows: COM automation via pywin32
 """
 
 import argparse
+import os
+import re
 import shutil
+import stat
 import subprocess
 import sys
+import tempfile
+import zipfile
 from pathlib import Path
 
+try:
+    import lxml.etree
+except ImportError:
+    lxml = None
+
 IS_WINDOWS = sys.platform == "win32"
 IS_MACOS = sys.platform == "darwin"
 
@@ -19,27 +33,135 @@ if IS_WINDOWS:
     except ImportError:
         win32com = None
 
+WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W = f"{{{WORD_NS}}}"
+
+# Parts that can carry revision marks
+_REVISION_PARTS = re.compile(
+    r"word/(document|header\d*|footer\d*|footnotes|endnotes|comments)\.xml"
+)
+
+# Formatting-change records hold the pre-change properties
+_PROPERTY_CHANGE_TAGS = tuple(
+    f"{W}{name}"
+    for name in (
+        "rPrChange",
+        "pPrChange",
+        "sectPrChange",
+        "tblPrChange",
+        "trPrChange",
+        "tcPrChange",
+        "tblGridChange",
+        "numberingChange",
+    )
+)
+
+# Revision records whose content is dropped on accept
+_DROP_TAGS = tuple(
+    f"{W}{name}"
+    for name in (
+        "del",
+        "moveFrom",
+        "moveFromRangeStart",
+        "moveFromRangeEnd",
+        "moveToRangeStart",
+        "moveToRangeEnd",
+        "cellIns",
+    )
+)
+
+# Revision wrappers whose children are kept on accept
+_UNWRAP_TAGS = (f"{W}ins", f"{W}moveTo")
+
+
+def _accept_revisions(root) -> None:
+    # Formatting changes first, so the old properties they hold are not
+    # mistaken for live revision marks below.
+    for elem in list(root.iter(*_PROPERTY_CHANGE_TAGS)):
+        elem.getparent().remove(elem)
+
+    # Deleted table rows and cells
+    for mark in list(root.iter(f"{W}del")):
+        props = mark.getparent()
+        if props is not None and props.tag == f"{W}trPr":
+            row = props.getparent()
+            row.getparent().remove(row)
+    for mark in list(root.iter(f"{W}cellDel")):
+        cell = mark.getparent().getparent()
+        cell.getparent().remove(cell)
+
+    # Paragraph-mark revisions live in w:pPr/w:rPr. An inserted mark just
+    # loses its marker; a deleted mark merges the paragraph into the next one.
+    for mark in list(root.iter(f"{W}ins", f"{W}del")):
+        rpr = mark.getparent()
+        if rpr is None or rpr.tag != f"{W}rPr":
+            continue
+        ppr = rpr.getparent()
+        if ppr is None or ppr.tag != f"{W}pPr":
+            continue
+        rpr.remove(mark)
+        if mark.tag != f"{W}del":
+            continue
+        para = ppr.getparent()
+        following = para.getnext()
+        if following is None or following.tag != f"{W}p":
+            continue
+        index = 1 if len(following) and following[0].tag == f"{W}pPr" else 0
+        for child in [c for c in para if c.tag != f"{W}pPr"]:
+            following.insert(index, child)
+            index += 1
+        para.getparent().remove(para)
+
+    for elem in list(root.iter(*_DROP_TAGS)):
+        parent = elem.getparent()
+        if parent is not None:
+            parent.remove(elem)
+
+    for elem in list(root.iter(*_UNWRAP_TAGS)):
+        parent = elem.getparent()
+        if parent is None:
+            continue
+        index = parent.index(elem)
+        for offset, child in enumerate(list(elem)):
+            parent.insert(index + offset, child)
+        parent.remove(elem)
+
+
+def _accept_changes_xml(abs_output: str) -> tuple[None, str | None]:
+    if lxml is None:
+        return None, "Error: lxml is not installed"
+
+    parser = lxml.etree.XMLParser(resolve_entities=False)
+    fd, tmp_path = tempfile.mkstemp(
+        suffix=".docx", dir=os.path.dirname(abs_output)
+    )
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(abs_output) as src, zipfile.ZipFile(tmp_path, "w") as dst:
+            for info in src.infolist():
+                data = src.read(info.filename)
+                if _REVISION_PARTS.fullmatch(info.filename):
+                    root = lxml.etree.fromstring(data, parser)
+                    _accept_revisions(root)
+                    data = lxml.etree.tostring(
+                        root, xml_declaration=True, encoding="UTF-8", standalone=True
+                    )
+                dst.writestr(info, data)
+        os.replace(tmp_path, abs_output)
+    except (lxml.etree.XMLSyntaxError, zipfile.BadZipFile) as e:
+        return None, f"Error: Could not rewrite document XML: {e}"
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return None, None
+
 
 def _accept_changes_macos(abs_output: str) -> tuple[None, str | None]:
-    script = f'''
-    tell application "Microsoft Word"
-        activate
-        open POSIX file "{abs_output}"
-        delay 1
-        set theDocument to active document
-        accept all revisions of theDocument
-        save theDocument
-        close theDocument saving no
-    end tell
-    '''
+    from office.msoffice import run_word_applescript
 
     try:
-        result = subprocess.run(
-            ["osascript", "-e", script],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
+        result = run_word_applescript(["acceptChanges", abs_output], timeout=30)
     except subprocess.TimeoutExpired:
         return None, "Error: Word timed out accepting changes"
 
@@ -79,10 +201,15 @@ def accept_changes(
     input_path = Path(input_file)
     output_path = Path(output_file)
 
-    if not input_path.exists():
+    try:
+        st = input_path.stat()
+    except FileNotFoundError:
         return None, f"Error: Input file not found: {input_file}"
 
-    if not input_path.suffix.lower() == ".docx":
+    if not stat.S_ISREG(st.st_mode):
+        return None, f"Error: Input path is not a file: {input_file}"
+
+    if input_path.suffix.lower() != ".docx":
         return None, f"Error: Input file is not a DOCX file: {input_file}"
 
     try:
@@ -93,12 +220,13 @@ def accept_changes(
 
     abs_output = str(output_path.resolve())
 
-    if IS_WINDOWS:
-        _, error = _accept_changes_win32(abs_output)
-    elif IS_MACOS:
-        _, error = _accept_changes_macos(abs_output)
-    else:
-        return None, f"Error: Unsupported platform: {sys.platform}"
+    _, error = _accept_changes_xml(abs_output)
+    if error is not None:
+        # Fall back to Word when the XML path is unavailable
+        if IS_WINDOWS:
+            _, error = _accept_changes_win32(abs_output)
+        elif IS_MACOS:
+            _, error = _accept_changes_macos(abs_output)
 
     if error is not None:
         return None, f"{error}: {input_file}"
@@ -4,14 +4,21 @@ macOS: AppleScript via osascript
 Windows: COM automation via pywin32
 
 Usage:
-    from office.msoffice import convert_to_pdf, convert_doc_to_docx
+    from office.msoffice import convert_to_pdf, convert_doc_to_docx, convert_many_to_pdf
 
     convert_to_pdf("document.docx", "/tmp/output")
     convert_doc_to_docx("legacy.doc", "/tmp/output")
+    convert_many_to_pdf(["a.docx", "b.docx"], "/tmp/output")
 """
 
+import atexit
+import hashlib
+import os
+import stat
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 IS_WINDOWS = sys.platform == "win32"
@@ -19,143 +26,224 @@ IS_MACOS = sys.platform == "darwin"
 
 if IS_WINDOWS:
     try:
+        import pythoncom
         import win32com.client
     except ImportError:
         win32com = None
 
+# Word SaveAs format codes (Windows); the macOS script handles the same keys
+_WIN32_FORMATS = {
+    "pdf": 17,  # wdFormatPDF
+    "docx": 12,  # wdFormatDocumentDefault
+}
 
-def _convert_to_pdf_macos(input_path: Path, pdf_path: Path) -> None:
-    script = f'''
-    tell application "Microsoft Word"
-        activate
-        open POSIX file "{input_path}"
-        delay 1
-        set theDocument to active document
-        save as theDocument file name "{pdf_path}" file format format PDF
-        close theDocument saving no
-    end tell
-    '''
-
-    result = subprocess.run(
-        ["osascript", "-e", script],
-        capture_output=True,
-        text=True,
-        timeout=60,
-    )
+# macOS: Word handlers, compiled to a .scpt in the user's cache on first use
+_WORD_SCRIPT_SOURCE = Path(__file__).with_name("word_convert.applescript")
+_WORD_SCRIPT_CACHE = Path.home() / ".cache" / "skills"
 
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"Word PDF conversion failed: {result.stderr.strip()}"
-        )
+# Upper bound on parallel Word processes for convert_many (Word session limits)
+_MAX_WORKERS = 4
+
+_APP = None
+
+
+def _quit_app() -> None:
+    global _APP
+    if _APP is not None:
+        try:
+            _APP.Quit()
+        except Exception:
+            pass
+        _APP = None
 
 
-def _convert_to_pdf_win32(input_path: Path, pdf_path: Path) -> None:
+def _require_pywin32() -> None:
     if win32com is None:
         raise RuntimeError(
             "pywin32 is required for Office automation on Windows. "
             "Install it with: pip install pywin32"
         )
 
-    app = win32com.client.Dispatch("Word.Application")
+
+def _new_app():
+    _require_pywin32()
+    # DispatchEx starts a private Word process rather than attaching to the
+    # user's session, so it is safe to quit it when we are done.
+    app = win32com.client.DispatchEx("Word.Application")
     app.Visible = False
+    app.DisplayAlerts = 0  # wdAlertsNone
+    return app
+
+
+def _get_app():
+    """Return a hidden Word instance shared by every conversion in this process."""
+    global _APP
+    if _APP is None:
+        _APP = _new_app()
+        atexit.register(_quit_app)
+    return _APP
+
+
+def _convert_win32_worker(pairs: list[tuple[Path, Path]], fmt: str) -> None:
+    """Convert (input, output) pairs in a Word process owned by this thread."""
+    pythoncom.CoInitialize()
+    app = None
+    try:
+        app = _new_app()
+        for input_path, output_path in pairs:
+            _convert_win32(app, input_path, output_path, fmt)
+    finally:
+        if app is not None:
+            try:
+                app.Quit()
+            except Exception:
+                pass
+        pythoncom.CoUninitialize()
+
+
+def _convert_win32(app, input_path: Path, output_path: Path, fmt: str) -> None:
     doc = None
     try:
         doc = app.Documents.Open(str(input_path))
-        doc.SaveAs(str(pdf_path), FileFormat=17)  # wdFormatPDF = 17
+        doc.SaveAs(str(output_path), FileFormat=_WIN32_FORMATS[fmt])
     finally:
         if doc is not None:
             doc.Close(SaveChanges=False)
 
 
-def convert_to_pdf(input_path: str, output_dir: str) -> Path:
-    """Convert a DOCX file to PDF using Microsoft Word."""
-    input_path = Path(input_path).resolve()
-    output_dir = Path(output_dir).resolve()
-
-    if not input_path.exists():
-        raise FileNotFoundError(f"Input file not found: {input_path}")
-
-    output_dir.mkdir(parents=True, exist_ok=True)
-    pdf_path = output_dir / f"{input_path.stem}.pdf"
-
-    if IS_WINDOWS:
-        _convert_to_pdf_win32(input_path, pdf_path)
-    elif IS_MACOS:
-        _convert_to_pdf_macos(input_path, pdf_path)
-    else:
-        raise RuntimeError(f"Unsupported platform: {sys.platform}")
-
-    if not pdf_path.exists():
-        raise RuntimeError(f"PDF not created at {pdf_path}")
-
-    return pdf_path
+def _word_script() -> Path:
+    """Return the compiled Word script, compiling it on first use.
 
+    The cached .scpt is named after a hash of the source, so every skill
+    install sharing the cache gets the build matching its own script. It is
+    compiled to a temporary file and moved into place, so concurrent callers
+    never see a partial .scpt. Falls back to the plain-text source (which
+    osascript can also run) when the cache is not writable or osacompile fails.
+    """
+    digest = hashlib.sha256(_WORD_SCRIPT_SOURCE.read_bytes()).hexdigest()[:16]
+    compiled = _WORD_SCRIPT_CACHE / f"word_convert-{digest}.scpt"
+    if compiled.exists():
+        return compiled
+    try:
+        _WORD_SCRIPT_CACHE.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".scpt", dir=_WORD_SCRIPT_CACHE)
+    except OSError:
+        return _WORD_SCRIPT_SOURCE
+    os.close(fd)
+    try:
+        result = subprocess.run(
+            ["osacompile", "-o", tmp_path, str(_WORD_SCRIPT_SOURCE)],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            return _WORD_SCRIPT_SOURCE
+        os.replace(tmp_path, compiled)
+    except OSError:
+        return _WORD_SCRIPT_SOURCE
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return compiled
 
-def _convert_doc_to_docx_macos(input_path: Path, docx_path: Path) -> None:
-    script = f'''
-    tell application "Microsoft Word"
-        activate
-        open POSIX file "{input_path}"
-        delay 1
-        set theDocument to active document
-        save as theDocument file name "{docx_path}" file format format document
-        close theDocument saving no
-    end tell
-    '''
 
-    result = subprocess.run(
-        ["osascript", "-e", script],
+def run_word_applescript(args: list[str], timeout: int) -> subprocess.CompletedProcess:
+    """Run a handler from word_convert.applescript with the given arguments."""
+    return subprocess.run(
+        ["osascript", str(_word_script()), *args],
         capture_output=True,
         text=True,
-        timeout=60,
+        timeout=timeout,
     )
 
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"Word DOCX conversion failed: {result.stderr.strip()}"
-        )
 
+def _convert_many_macos(
+    input_paths: list[Path], output_paths: list[Path], fmt: str
+) -> None:
+    args = ["convert", fmt]
+    for input_path, output_path in zip(input_paths, output_paths):
+        args += [str(input_path), str(output_path)]
 
-def _convert_doc_to_docx_win32(input_path: Path, docx_path: Path) -> None:
-    if win32com is None:
+    result = run_word_applescript(args, timeout=60 * len(input_paths))
+
+    if result.returncode != 0:
         raise RuntimeError(
-            "pywin32 is required for Office automation on Windows. "
-            "Install it with: pip install pywin32"
+            f"Word {fmt.upper()} conversion failed: {result.stderr.strip()}"
         )
 
-    app = win32com.client.Dispatch("Word.Application")
-    app.Visible = False
-    doc = None
-    try:
-        doc = app.Documents.Open(str(input_path))
-        doc.SaveAs(str(docx_path), FileFormat=12)  # wdFormatDocumentDefault = 12
-    finally:
-        if doc is not None:
-            doc.Close(SaveChanges=False)
 
+def convert_many(
+    input_paths: list[str], output_dir: str, fmt: str = "pdf", workers: int = 2
+) -> list[Path]:
+    """Convert several files with as few Word sessions as possible.
 
-def convert_doc_to_docx(input_path: str, output_dir: str) -> Path:
-    """Convert a legacy .doc file to .docx using Microsoft Word."""
-    input_path = Path(input_path).resolve()
+    On macOS all files go through one osascript invocation. On Windows the
+    files are split across up to `workers` private Word processes (capped at
+    _MAX_WORKERS); with a single worker the shared process from _get_app() is
+    used. Supports the same formats as run_office_convert.
+    """
+    if fmt not in _WIN32_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    inputs = [Path(p).resolve() for p in input_paths]
     output_dir = Path(output_dir).resolve()
 
-    if not input_path.exists():
-        raise FileNotFoundError(f"Input file not found: {input_path}")
+    for input_path in inputs:
+        try:
+            is_file = stat.S_ISREG(input_path.stat().st_mode)
+        except FileNotFoundError:
+            is_file = False
+        if not is_file:
+            raise FileNotFoundError(f"Input file not found: {input_path}")
 
     output_dir.mkdir(parents=True, exist_ok=True)
-    docx_path = output_dir / f"{input_path.stem}.docx"
+    outputs = [output_dir / f"{p.stem}.{fmt}" for p in inputs]
+
+    if not inputs:
+        return outputs
 
     if IS_WINDOWS:
-        _convert_doc_to_docx_win32(input_path, docx_path)
+        # Fail before any worker runs; without pywin32, pythoncom is unbound
+        _require_pywin32()
+        pairs = list(zip(inputs, outputs))
+        workers = max(1, min(workers, _MAX_WORKERS, len(pairs)))
+        if workers == 1:
+            app = _get_app()
+            for input_path, output_path in pairs:
+                _convert_win32(app, input_path, output_path, fmt)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_convert_win32_worker, pairs[i::workers], fmt)
+                    for i in range(workers)
+                ]
+                for future in futures:
+                    future.result()
     elif IS_MACOS:
-        _convert_doc_to_docx_macos(input_path, docx_path)
+        _convert_many_macos(inputs, outputs, fmt)
     else:
         raise RuntimeError(f"Unsupported platform: {sys.platform}")
 
-    if not docx_path.exists():
-        raise RuntimeError(f"DOCX not created at {docx_path}")
+    for output_path in outputs:
+        if not output_path.exists():
+            raise RuntimeError(f"{fmt.upper()} not created at {output_path}")
+
+    return outputs
+
+
+def convert_many_to_pdf(input_paths: list[str], output_dir: str) -> list[Path]:
+    """Convert several DOCX files to PDF in one Word session."""
+    return convert_many(input_paths, output_dir, fmt="pdf")
 
-    return docx_path
+
+def convert_to_pdf(input_path: str, output_dir: str) -> Path:
+    """Convert a DOCX file to PDF using Microsoft Word."""
+    return convert_many_to_pdf([input_path], output_dir)[0]
+
+
+def convert_doc_to_docx(input_path: str, output_dir: str) -> Path:
+    """Convert a legacy .doc file to .docx using Microsoft Word."""
+    return convert_many([input_path], output_dir, fmt="docx")[0]
 
 
 def run_office_convert(input_path: str, output_dir: str, fmt: str = "pdf") -> Path:
@@ -176,14 +264,20 @@ if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Convert files using native Office apps")
-    parser.add_argument("input", help="Input file path")
+    parser.add_argument("input", nargs="+", help="Input file path(s)")
     parser.add_argument("--convert-to", default="pdf", help="Output format (default: pdf)")
     parser.add_argument("--outdir", default=".", help="Output directory")
+    parser.add_argument(
+        "--workers", type=int, default=2,
+        help="Parallel Word processes on Windows (default: 2)",
+    )
     args = parser.parse_args()
 
     try:
-        result = run_office_convert(args.input, args.outdir, args.convert_to)
-        print(f"Converted: {result}")
+        for result in convert_many(
+            args.input, args.outdir, args.convert_to, workers=args.workers
+        ):
+            print(f"Converted: {result}")
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -2,6 +2,8 @@
 """
 Architecture Diagram — 3-layer swimlane system diagram with visual polish.
 Run: pip install python-pptx lxml && python architecture_diagram.py && open architecture_diagram.pptx
+Set DIAGRAM_FAST_SAVE=1 to write an uncompressed (ZIP_STORED) .pptx for quick local previews.
+Set DIAGRAM_ICON_DIR to a directory of {prefix}/{name}.svg icons to resolve ICONS without network access.
 """
 
 # DESIGN RATIONALE:
@@ -25,7 +27,22 @@ Run: pip install python-pptx lxml && python architecture_diagram.py && open arch
 from pptx import Presentation
 from pptx.util import Emu
 from lxml import etree
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+import base64
+import http.client
 import os
+import threading
+import urllib.parse
+import urllib.request
+import zipfile
+from xml.sax.saxutils import escape
+
+try:
+    import resvg_py  # Rust SVG rasterizer; much faster than cairosvg
+except ImportError:
+    resvg_py = None
 
 SLIDE_W, SLIDE_H = 9144000, 5143500
 
@@ -77,7 +94,34 @@ STYLE_COLORS = {
     "neutral": ("5D6D7E", "2C3E50"),
 }
 
-# Icon assignments — Iconify prefix:name keys (requires: pip install cairosvg)
+# Component gradient fill + outline per style, formatted once at import
+_STYLE_XML = {
+    style: (
+        '<a:gradFill><a:gsLst>'
+        f'<a:gs pos="0"><a:srgbClr val="{fill}"/></a:gs>'
+        f'<a:gs pos="100000"><a:srgbClr val="{border}"/></a:gs>'
+        '</a:gsLst><a:lin ang="5400000" scaled="0"/></a:gradFill>'
+        f'<a:ln w="25400"><a:solidFill><a:srgbClr val="{border}"/></a:solidFill><a:round/></a:ln>'
+    )
+    for style, (fill, border) in STYLE_COLORS.items()
+}
+
+# Quotes too, since labels and ids also land in name="..." attributes
+_XML_ENTITIES = {'"': "&quot;"}
+
+# COMPONENTS with id/text XML-escaped and the style resolved to its XML
+# fragment once at import
+_COMPS = [
+    (escape(cid, _XML_ENTITIES), escape(text, _XML_ENTITIES), preset, lane_idx,
+     _STYLE_XML[style])
+    for cid, text, preset, lane_idx, style in COMPONENTS
+]
+
+# ARROWS with endpoints resolved to component indices once at import
+_CID_INDEX = {comp[0]: i for i, comp in enumerate(COMPONENTS)}
+_ARROWS = [(_CID_INDEX[src], _CID_INDEX[tgt], color) for src, tgt, color in ARROWS]
+
+# Icon assignments — Iconify prefix:name keys (requires: pip install cairosvg or resvg_py)
 ICONS = {
     "web":    "mdi:web",
     "mobile": "mdi:cellphone",
@@ -97,70 +141,127 @@ ICONS = {
 TITLE_H = 500000
 TITLE_GAP = 91440          # 0.1" gap between title bar and first lane
 LANE_MARGIN_X = 137160     # 0.15" horizontal lane inset
+LANE_W = SLIDE_W - 2 * LANE_MARGIN_X
 BOTTOM_MARGIN = 91440      # 0.1" margin from slide bottom
 COMP_W, COMP_H = 1371600, 800100   # component shapes: 1.5" x 0.875" (increased height)
 COL_GAP = 304800
 
 
-def center_row(n, sw, gap):
-    total = n * sw + (n - 1) * gap
-    left = (SLIDE_W - total) // 2
-    return [left + i * (sw + gap) for i in range(n)]
+# Shared parser for generated fragments: no ID table, no entity expansion,
+# and indentation whitespace is dropped rather than kept as text nodes
+_PARSER = etree.XMLParser(
+    collect_ids=False, remove_blank_text=True, resolve_entities=False, huge_tree=False)
 
+# Synthetic root for parsing every shape fragment in a single fromstring() call
+_SHAPES_WRAPPER = (
+    '<p:spTree xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+    ' xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">%s</p:spTree>'
+)
 
-def make_legend_xml(
-    sid,                      # shape ID counter start
-    color_entries,            # list of (label, fill_hex)
-    line_entries=None,        # list of (label, color_hex, is_dashed)
-    x=None, y=None,           # position (defaults to bottom-right)
-    slide_w=9144000,
-    slide_h=5143500,
-    legend_w=1645920,         # ~1.8"
-):
-    """Build a legend box with color swatches and optional line-style entries.
+# --- XML templates (bound str.format; only per-shape fields are substituted) ---
+# Fragments omit xmlns declarations; _SHAPES_WRAPPER supplies them.
+_BG_TMPL = '''<p:sp>
+  <p:nvSpPr><p:cNvPr id="{sid}" name="Background"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
+  <p:spPr>
+    <a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
+    <a:prstGeom prst="rect"><a:avLst/></a:prstGeom>
+    <a:solidFill><a:srgbClr val="F5F6FA"/></a:solidFill>
+    <a:ln><a:noFill/></a:ln>
+  </p:spPr>
+  <p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:endParaRPr lang="en-US" dirty="0"/></a:p></p:txBody>
+</p:sp>'''.format
 
-    Returns:
-        (xml_list, next_sid) — list of XML strings to append to spTree,
-        and the next available shape ID.
-    """
-    line_entries = line_entries or []
-    n_color = len(color_entries)
-    n_line = len(line_entries)
-    n_total = n_color + n_line
+_LANE_TMPL = '''<p:sp>
+  <p:nvSpPr><p:cNvPr id="{sid}" name="Lane {label}"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
+  <p:spPr>
+    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
+    <a:prstGeom prst="rect"><a:avLst/></a:prstGeom>
+    <a:solidFill><a:srgbClr val="{fill}"/></a:solidFill>
+    <a:ln w="12700"><a:solidFill><a:srgbClr val="{border}"/></a:solidFill></a:ln>
+  </p:spPr>
+  <p:txBody>
+    <a:bodyPr wrap="square" anchor="t" lIns="91440" tIns="91440"><a:normAutofit/></a:bodyPr>
+    <a:lstStyle/>
+    <a:p><a:pPr algn="l"/>
+      <a:r><a:rPr lang="en-US" sz="900" b="1" dirty="0">
+        <a:solidFill><a:srgbClr val="888888"/></a:solidFill>
+        <a:latin typeface="Calibri"/>
+      </a:rPr><a:t>{label}</a:t></a:r>
+    </a:p>
+  </p:txBody>
+</p:sp>'''.format
 
-    # Sizing constants (EMU)
-    row_h = 256032          # ~0.28"
-    title_h = 274320        # ~0.30"
-    pad_top = 45720         # 0.05"
-    pad_bottom = 68580      # 0.075"
-    legend_h = pad_top + title_h + n_total * row_h + pad_bottom
+_TITLE_TMPL = '''<p:sp>
+  <p:nvSpPr><p:cNvPr id="{sid}" name="TitleBar"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
+  <p:spPr>
+    <a:xfrm><a:off x="{x}" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
+    <a:prstGeom prst="rect"><a:avLst/></a:prstGeom>
+    <a:gradFill>
+      <a:gsLst>
+        <a:gs pos="0"><a:srgbClr val="1F3864"/></a:gs>
+        <a:gs pos="100000"><a:srgbClr val="16294A"/></a:gs>
+      </a:gsLst>
+      <a:lin ang="0" scaled="0"/>
+    </a:gradFill>
+    <a:ln><a:noFill/></a:ln>
+  </p:spPr>
+  <p:txBody>
+    <a:bodyPr wrap="square" anchor="ctr"><a:normAutofit/></a:bodyPr>
+    <a:lstStyle/>
+    <a:p><a:pPr algn="ctr"/>
+      <a:r><a:rPr lang="en-US" sz="2200" b="1" dirty="0">
+        <a:solidFill><a:srgbClr val="FFFFFF"/></a:solidFill>
+        <a:latin typeface="Calibri"/>
+      </a:rPr><a:t>{title}</a:t></a:r>
+    </a:p>
+  </p:txBody>
+</p:sp>'''.format
 
-    margin = 137160         # 0.15" from slide edges
-    if x is None:
-        x = slide_w - legend_w - margin
-    if y is None:
-        y = slide_h - legend_h - margin
+_COMP_TMPL = '''<p:sp>
+  <p:nvSpPr>
+    <p:cNvPr id="{sid}" name="{cid}"/>
+    <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
+    <p:nvPr/>
+  </p:nvSpPr>
+  <p:spPr>
+    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
+    <a:prstGeom prst="{preset}"><a:avLst/></a:prstGeom>
+    {style_xml}
+    <a:effectLst>
+      <a:outerShdw blurRad="50800" dist="38100" dir="5400000" algn="tl" rotWithShape="0">
+        <a:srgbClr val="000000"><a:alpha val="35000"/></a:srgbClr>
+      </a:outerShdw>
+    </a:effectLst>
+  </p:spPr>
+  <p:txBody>
+    <a:bodyPr wrap="square" anchor="ctr"><a:normAutofit/></a:bodyPr>
+    <a:lstStyle/>
+    <a:p><a:pPr algn="ctr"/>
+      <a:r><a:rPr lang="en-US" sz="1200" b="1" dirty="0">
+        <a:solidFill><a:srgbClr val="FFFFFF"/></a:solidFill>
+        <a:latin typeface="Calibri"/>
+      </a:rPr><a:t>{text}</a:t></a:r>
+    </a:p>
+  </p:txBody>
+</p:sp>'''.format
 
-    swatch_size = 164592    # ~0.18"
-    swatch_left = 91440     # 0.1" from legend left edge
-    label_left = swatch_left + swatch_size + 68580  # swatch + 0.075" gap
-    label_w = legend_w - label_left - 45720
 
-    line_sample_w = 365760  # 0.4"
-    line_sample_left = swatch_left
+def center_row(n, sw, gap):
+    total = n * sw + (n - 1) * gap
+    left = (SLIDE_W - total) // 2
+    step = sw + gap
+    return range(left, left + n * step, step)
 
-    xmls = []
 
-    # --- Container box ---
-    container_xml = f'''<p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-       xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+# Legend shapes for make_legend_xml
+_LEGEND_BOX_TMPL = '''<p:sp>
   <p:nvSpPr>
     <p:cNvPr id="{sid}" name="Legend Box"/>
     <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
     <p:nvPr/>
   </p:nvSpPr>
   <p:spPr>
-    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{legend_w}" cy="{legend_h}"/></a:xfrm>
+    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
     <a:prstGeom prst="roundRect"><a:avLst><a:gd name="adj" fmla="val 3200"/></a:avLst></a:prstGeom>
     <a:solidFill><a:srgbClr val="FFFFFF"><a:alpha val="85000"/></a:srgbClr></a:solidFill>
     <a:ln w="12700"><a:solidFill><a:srgbClr val="B0B0B0"/></a:solidFill><a:round/></a:ln>
@@ -177,42 +278,31 @@ def make_legend_xml(
       </a:rPr><a:t>Legend</a:t></a:r>
     </a:p>
   </p:txBody>
-</p:sp>'''
-    xmls.append(container_xml)
-    sid += 1
+</p:sp>'''.format
 
-    # --- Color swatch entries ---
-    for i, (label, fill_hex) in enumerate(color_entries):
-        ey = y + pad_top + title_h + i * row_h
-        swatch_y = ey + (row_h - swatch_size) // 2
-
-        swatch_xml = f'''<p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-       xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+_LEGEND_SWATCH_TMPL = '''<p:sp>
   <p:nvSpPr>
-    <p:cNvPr id="{sid}" name="Legend Swatch {i}"/>
+    <p:cNvPr id="{sid}" name="Legend Swatch {index}"/>
     <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
     <p:nvPr/>
   </p:nvSpPr>
   <p:spPr>
-    <a:xfrm><a:off x="{x + swatch_left}" y="{swatch_y}"/><a:ext cx="{swatch_size}" cy="{swatch_size}"/></a:xfrm>
+    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{size}" cy="{size}"/></a:xfrm>
     <a:prstGeom prst="roundRect"><a:avLst><a:gd name="adj" fmla="val 10000"/></a:avLst></a:prstGeom>
-    <a:solidFill><a:srgbClr val="{fill_hex}"/></a:solidFill>
-    <a:ln w="6350"><a:solidFill><a:srgbClr val="{fill_hex}"/></a:solidFill><a:round/></a:ln>
+    <a:solidFill><a:srgbClr val="{fill}"/></a:solidFill>
+    <a:ln w="6350"><a:solidFill><a:srgbClr val="{fill}"/></a:solidFill><a:round/></a:ln>
   </p:spPr>
   <p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:endParaRPr lang="en-US" dirty="0"/></a:p></p:txBody>
-</p:sp>'''
-        xmls.append(swatch_xml)
-        sid += 1
+</p:sp>'''.format
 
-        label_xml = f'''<p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-       xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+_LEGEND_LABEL_TMPL = '''<p:sp>
   <p:nvSpPr>
-    <p:cNvPr id="{sid}" name="Legend Label {i}"/>
+    <p:cNvPr id="{sid}" name="{name}"/>
     <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
     <p:nvPr/>
   </p:nvSpPr>
   <p:spPr>
-    <a:xfrm><a:off x="{x + label_left}" y="{ey}"/><a:ext cx="{label_w}" cy="{row_h}"/></a:xfrm>
+    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
     <a:prstGeom prst="rect"><a:avLst/></a:prstGeom>
     <a:noFill/>
     <a:ln><a:noFill/></a:ln>
@@ -229,135 +319,127 @@ def make_legend_xml(
       </a:rPr><a:t>{label}</a:t></a:r>
     </a:p>
   </p:txBody>
-</p:sp>'''
-        xmls.append(label_xml)
-        sid += 1
-
-    # --- Line style entries ---
-    for j, (label, color_hex, is_dashed) in enumerate(line_entries):
-        ey = y + pad_top + title_h + (n_color + j) * row_h
-        line_y = ey + row_h // 2
-        dash_val = "dash" if is_dashed else "solid"
+</p:sp>'''.format
 
-        line_xml = f'''<p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-       xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+_LEGEND_LINE_TMPL = '''<p:sp>
   <p:nvSpPr>
-    <p:cNvPr id="{sid}" name="Legend Line {j}"/>
+    <p:cNvPr id="{sid}" name="Legend Line {index}"/>
     <p:cNvSpPr/>
     <p:nvPr/>
   </p:nvSpPr>
   <p:spPr>
-    <a:xfrm><a:off x="{x + line_sample_left}" y="{line_y}"/><a:ext cx="{line_sample_w}" cy="1"/></a:xfrm>
+    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{w}" cy="1"/></a:xfrm>
     <a:custGeom>
       <a:avLst/><a:gdLst/><a:ahLst/><a:cxnLst/>
-      <a:rect l="0" t="0" r="{line_sample_w}" b="1"/>
+      <a:rect l="0" t="0" r="{w}" b="1"/>
       <a:pathLst>
-        <a:path w="{line_sample_w}" h="1">
+        <a:path w="{w}" h="1">
           <a:moveTo><a:pt x="0" y="0"/></a:moveTo>
-          <a:lnTo><a:pt x="{line_sample_w}" y="0"/></a:lnTo>
+          <a:lnTo><a:pt x="{w}" y="0"/></a:lnTo>
         </a:path>
       </a:pathLst>
     </a:custGeom>
     <a:noFill/>
     <a:ln w="19050">
-      <a:solidFill><a:srgbClr val="{color_hex}"/></a:solidFill>
-      <a:prstDash val="{dash_val}"/>
+      <a:solidFill><a:srgbClr val="{color}"/></a:solidFill>
+      <a:prstDash val="{dash}"/>
       <a:round/>
     </a:ln>
   </p:spPr>
   <p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:endParaRPr lang="en-US" dirty="0"/></a:p></p:txBody>
-</p:sp>'''
+</p:sp>'''.format
+
+
+def make_legend_xml(
+    sid,                      # shape ID counter start
+    color_entries,            # list of (label, fill_hex)
+    line_entries=None,        # list of (label, color_hex, is_dashed)
+    x=None, y=None,           # position (defaults to bottom-right)
+    slide_w=9144000,
+    slide_h=5143500,
+    legend_w=1645920,         # ~1.8"
+):
+    """Build a legend box with color swatches and optional line-style entries.
+
+    Returns:
+        (xml_list, next_sid) — list of <p:sp> fragments (without namespace
+        declarations) to parse inside _SHAPES_WRAPPER, and the next
+        available shape ID.
+    """
+    line_entries = line_entries or []
+    n_color = len(color_entries)
+    n_line = len(line_entries)
+    n_total = n_color + n_line
+
+    # Sizing constants (EMU)
+    row_h = 256032          # ~0.28"
+    title_h = 274320        # ~0.30"
+    pad_top = 45720         # 0.05"
+    pad_bottom = 68580      # 0.075"
+    legend_h = pad_top + title_h + n_total * row_h + pad_bottom
+
+    margin = 137160         # 0.15" from slide edges
+    if x is None:
+        x = slide_w - legend_w - margin
+    if y is None:
+        y = slide_h - legend_h - margin
+
+    swatch_size = 164592    # ~0.18"
+    swatch_left = 91440     # 0.1" from legend left edge
+    label_left = swatch_left + swatch_size + 68580  # swatch + 0.075" gap
+    label_w = legend_w - label_left - 45720
+
+    line_sample_w = 365760  # 0.4"
+    line_sample_left = swatch_left
+
+    xmls = []
+
+    # --- Container box ---
+    container_xml = _LEGEND_BOX_TMPL(sid=sid, x=x, y=y, cx=legend_w, cy=legend_h)
+    xmls.append(container_xml)
+    sid += 1
+
+    # --- Color swatch entries ---
+    for i, (label, fill_hex) in enumerate(color_entries):
+        ey = y + pad_top + title_h + i * row_h
+        swatch_y = ey + (row_h - swatch_size) // 2
+
+        swatch_xml = _LEGEND_SWATCH_TMPL(
+            sid=sid, index=i, x=x + swatch_left, y=swatch_y, size=swatch_size, fill=fill_hex)
+        xmls.append(swatch_xml)
+        sid += 1
+
+        label_xml = _LEGEND_LABEL_TMPL(
+            sid=sid, name=f"Legend Label {i}", x=x + label_left, y=ey,
+            cx=label_w, cy=row_h, label=escape(label, _XML_ENTITIES))
+        xmls.append(label_xml)
+        sid += 1
+
+    # --- Line style entries ---
+    for j, (label, color_hex, is_dashed) in enumerate(line_entries):
+        ey = y + pad_top + title_h + (n_color + j) * row_h
+        line_y = ey + row_h // 2
+        dash_val = "dash" if is_dashed else "solid"
+
+        line_xml = _LEGEND_LINE_TMPL(
+            sid=sid, index=j, x=x + line_sample_left, y=line_y, w=line_sample_w,
+            color=color_hex, dash=dash_val)
         xmls.append(line_xml)
         sid += 1
 
         line_label_left = line_sample_left + line_sample_w + 68580
         line_label_w = legend_w - line_label_left - 45720
 
-        line_label_xml = f'''<p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-       xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
-  <p:nvSpPr>
-    <p:cNvPr id="{sid}" name="Legend Line Label {j}"/>
-    <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
-    <p:nvPr/>
-  </p:nvSpPr>
-  <p:spPr>
-    <a:xfrm><a:off x="{x + line_label_left}" y="{ey}"/><a:ext cx="{line_label_w}" cy="{row_h}"/></a:xfrm>
-    <a:prstGeom prst="rect"><a:avLst/></a:prstGeom>
-    <a:noFill/>
-    <a:ln><a:noFill/></a:ln>
-  </p:spPr>
-  <p:txBody>
-    <a:bodyPr wrap="square" anchor="ctr" lIns="0" tIns="0" rIns="0" bIns="0">
-      <a:normAutofit/>
-    </a:bodyPr>
-    <a:lstStyle/>
-    <a:p><a:pPr algn="l"/>
-      <a:r><a:rPr lang="en-US" sz="900" b="0" dirty="0">
-        <a:solidFill><a:srgbClr val="2C3E50"/></a:solidFill>
-        <a:latin typeface="Calibri"/>
-      </a:rPr><a:t>{label}</a:t></a:r>
-    </a:p>
-  </p:txBody>
-</p:sp>'''
+        line_label_xml = _LEGEND_LABEL_TMPL(
+            sid=sid, name=f"Legend Line Label {j}", x=x + line_label_left, y=ey,
+            cx=line_label_w, cy=row_h, label=escape(label, _XML_ENTITIES))
         xmls.append(line_label_xml)
         sid += 1
 
     return xmls, sid
 
 
-def build_routed_connector_xml(waypoints, sid, name="Connector",
-                                color="888888", width=19050,
-                                dash="solid", tail="triangle",
-                                head="none", radius=150000):
-    """Orthogonal connector with curved elbows using custom geometry."""
-    xs = [p[0] for p in waypoints]
-    ys = [p[1] for p in waypoints]
-    min_x, min_y = min(xs), min(ys)
-    max_x, max_y = max(xs), max(ys)
-    bbox_w = max(max_x - min_x, 1)
-    bbox_h = max(max_y - min_y, 1)
-
-    pts = [(x - min_x, y - min_y) for x, y in waypoints]
-
-    def direction(a, b):
-        dx, dy = b[0] - a[0], b[1] - a[1]
-        if dx > 0: return 'R'
-        if dx < 0: return 'L'
-        if dy > 0: return 'D'
-        return 'U'
-
-    ARC = {
-        ('R', 'D'): (16200000, 5400000),   ('R', 'U'): (5400000, -5400000),
-        ('L', 'D'): (16200000, -5400000),  ('L', 'U'): (5400000, 5400000),
-        ('D', 'R'): (10800000, -5400000),  ('D', 'L'): (0, 5400000),
-        ('U', 'R'): (10800000, 5400000),   ('U', 'L'): (0, -5400000),
-    }
-
-    path_cmds = [f'<a:moveTo><a:pt x="{pts[0][0]}" y="{pts[0][1]}"/></a:moveTo>']
-    for i in range(1, len(pts)):
-        if i < len(pts) - 1:
-            prev_dir = direction(pts[i-1], pts[i])
-            next_dir = direction(pts[i], pts[i+1])
-            seg_before = abs(pts[i][0]-pts[i-1][0]) + abs(pts[i][1]-pts[i-1][1])
-            seg_after = abs(pts[i+1][0]-pts[i][0]) + abs(pts[i+1][1]-pts[i][1])
-            r = min(radius, seg_before // 2, seg_after // 2)
-            bx, by = pts[i][0], pts[i][1]
-            if prev_dir == 'R': bx -= r
-            elif prev_dir == 'L': bx += r
-            elif prev_dir == 'D': by -= r
-            elif prev_dir == 'U': by += r
-            path_cmds.append(f'<a:lnTo><a:pt x="{bx}" y="{by}"/></a:lnTo>')
-            st, sw = ARC[(prev_dir, next_dir)]
-            path_cmds.append(f'<a:arcTo wR="{r}" hR="{r}" stAng="{st}" swAng="{sw}"/>')
-        else:
-            path_cmds.append(f'<a:lnTo><a:pt x="{pts[i][0]}" y="{pts[i][1]}"/></a:lnTo>')
-
-    path_data = ''.join(path_cmds)
-    head_xml = f'<a:headEnd type="{head}" w="med" len="med"/>' if head != "none" else '<a:headEnd type="none"/>'
-    tail_xml = f'<a:tailEnd type="{tail}" w="med" len="med"/>' if tail != "none" else '<a:tailEnd type="none"/>'
-
-    return f'''<p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-       xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+_CONN_TMPL = '''<p:sp>
   <p:nvSpPr>
     <p:cNvPr id="{sid}" name="{name}"/>
     <p:cNvSpPr/>
@@ -387,13 +469,184 @@ def build_routed_connector_xml(waypoints, sid, name="Connector",
     </a:ln>
   </p:spPr>
   <p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:endParaRPr lang="en-US" dirty="0"/></a:p></p:txBody>
-</p:sp>'''
+</p:sp>'''.format
 
+# Path commands for build_routed_connector_xml (integer-only %-formatting)
+_MV = '<a:moveTo><a:pt x="%d" y="%d"/></a:moveTo>'
+_LN = '<a:lnTo><a:pt x="%d" y="%d"/></a:lnTo>'
+_ARC = '<a:arcTo wR="%d" hR="%d" stAng="%d" swAng="%d"/>'
 
+# Segment directions as ordinals: R=0, L=1, D=2, U=3
+_R, _L, _D, _U = range(4)
+
+# Direction keyed by (sign dx, sign dy); horizontal wins on diagonals
+_DIR = {
+    (1, 0): _R, (1, 1): _R, (1, -1): _R,
+    (-1, 0): _L, (-1, 1): _L, (-1, -1): _L,
+    (0, 1): _D, (0, -1): _U, (0, 0): _U,
+}
+
+# Unit step back along each direction, used to stop short of an elbow
+_BACK_DX = (-1, 1, 0, 0)
+_BACK_DY = (0, 0, -1, 1)
+
+# (stAng, swAng) of the elbow arc, flat 4x4 table indexed by
+# incoming * 4 + outgoing; None marks straight-through or reversing pairs
+_ARC_ANGLES = (
+    None, None, (16200000, 5400000), (5400000, -5400000),     # from R
+    None, None, (16200000, -5400000), (5400000, 5400000),     # from L
+    (10800000, -5400000), (0, 5400000), None, None,           # from D
+    (10800000, 5400000), (0, -5400000), None, None,           # from U
+)
+
+
+@lru_cache(maxsize=None)
+def _path_fmt(n):
+    """Format string for a routed path through n points: one % call per connector."""
+    if n < 2:
+        return _MV  # a single waypoint is just the moveTo
+    return _MV + (_LN + _ARC) * (n - 2) + _LN
+
+
+def _direction(a, b):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    return _DIR[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))]
+
+
+@lru_cache(maxsize=None)
+def _line_ends(head, tail):
+    """Return the (headEnd, tailEnd) XML for an arrow style; shared across connectors."""
+    head_xml = f'<a:headEnd type="{head}" w="med" len="med"/>' if head != "none" else '<a:headEnd type="none"/>'
+    tail_xml = f'<a:tailEnd type="{tail}" w="med" len="med"/>' if tail != "none" else '<a:tailEnd type="none"/>'
+    return head_xml, tail_xml
+
+
+def build_routed_connector_xml(waypoints, sid, name="Connector",
+                                color="888888", width=19050,
+                                dash="solid", tail="triangle",
+                                head="none", radius=150000):
+    """Orthogonal connector with curved elbows using custom geometry.
+
+    Returns a <p:sp> fragment without namespace declarations; parse it inside
+    _SHAPES_WRAPPER, which declares the p: and a: prefixes once.
+    """
+    xs, ys = zip(*waypoints)  # one transpose instead of two comprehensions
+    min_x, min_y = min(xs), min(ys)
+    max_x, max_y = max(xs), max(ys)
+    bbox_w = max(max_x - min_x, 1)
+    bbox_h = max(max_y - min_y, 1)
+
+    pts = [(x - min_x, y - min_y) for x, y in waypoints]
+
+    # Direction and half-length of each segment, computed once and shared by
+    # the elbows at both of its ends
+    n = len(pts)
+    dirs = [_direction(a, b) for a, b in zip(pts, pts[1:])]
+    halves = [(abs(b[0] - a[0]) + abs(b[1] - a[1])) // 2 for a, b in zip(pts, pts[1:])]
+
+    # Integer fields for _path_fmt(n): moveTo (x, y), then per elbow
+    # lnTo (x, y) + arcTo (wR, hR, stAng, swAng), then the final lnTo (x, y)
+    vals = [0] * max(2, 6 * n - 8)
+    vals[0], vals[1] = pts[0]
+    for i in range(1, n - 1):
+        prev_dir, next_dir = dirs[i-1], dirs[i]
+        r = min(radius, halves[i-1], halves[i])
+        st, sw = _ARC_ANGLES[prev_dir * 4 + next_dir]
+        j = 6 * i - 4
+        vals[j:j + 6] = (pts[i][0] + _BACK_DX[prev_dir] * r,
+                         pts[i][1] + _BACK_DY[prev_dir] * r,
+                         r, r, st, sw)
+    vals[-2], vals[-1] = pts[-1]
+
+    path_data = _path_fmt(n) % tuple(vals)
+    head_xml, tail_xml = _line_ends(head, tail)
+
+    return _CONN_TMPL(
+        sid=sid, name=name, min_x=min_x, min_y=min_y, bbox_w=bbox_w, bbox_h=bbox_h,
+        path_data=path_data, width=width, color=color, dash=dash,
+        head_xml=head_xml, tail_xml=tail_xml)
+
+
+def _svg_renderer():
+    """Return render(svg_data, png_path, size), preferring resvg over cairosvg.
+
+    Raises ImportError when neither rasterizer is installed.
+    """
+    if resvg_py is not None:
+        def render(svg_data, png_path, size):
+            png = resvg_py.svg_to_bytes(svg_string=svg_data, width=size, height=size)
+            with open(png_path, "wb") as f:
+                f.write(bytes(png))
+        return render
+
+    import cairosvg
+
+    def render(svg_data, png_path, size):
+        cairosvg.svg2png(bytestring=svg_data.encode(), write_to=png_path,
+                         output_width=size, output_height=size)
+    return render
+
+
+# Parallel icon downloads in enrich_slide_with_icons
+_ICON_WORKERS = 8
+
+# Optional offline icon set laid out as {prefix}/{name}.svg (Iconify exports,
+# which use currentColor for tinting); checked before any download
+_ICON_BUNDLE_DIR = os.environ.get("DIAGRAM_ICON_DIR")
+
+# One keep-alive HTTPS connection to Iconify per thread, so a run pays one
+# TLS handshake per worker rather than one per icon
+_ICONIFY_HOST = "api.iconify.design"
+_iconify_local = threading.local()
+
+
+def _iconify_connect(timeout):
+    """Open an HTTPS connection to Iconify, tunnelling through HTTPS_PROXY if set."""
+    proxy = urllib.request.getproxies().get("https")
+    if not proxy or urllib.request.proxy_bypass(_ICONIFY_HOST):
+        return http.client.HTTPSConnection(_ICONIFY_HOST, timeout=timeout)
+    parts = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    headers = {}
+    if parts.username:
+        creds = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+        headers["Proxy-Authorization"] = "Basic " + base64.b64encode(creds.encode()).decode()
+    conn = http.client.HTTPSConnection(parts.hostname, parts.port or 80, timeout=timeout)
+    conn.set_tunnel(_ICONIFY_HOST, 443, headers=headers)
+    return conn
+
+
+def _iconify_get(path, timeout=10):
+    """GET an Iconify API path and return the body bytes."""
+    conn = getattr(_iconify_local, "conn", None)
+    reused = conn is not None
+    while True:
+        if conn is None:
+            conn = _iconify_connect(timeout)
+            _iconify_local.conn = conn
+        try:
+            conn.request("GET", path, headers={"User-Agent": "python-pptx-diagrams/1.0"})
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            conn = _iconify_local.conn = None
+            if not reused:
+                raise
+            reused = False  # Server closed an idle connection; retry once
+            continue
+        if resp.status != 200:
+            raise OSError(f"HTTP {resp.status} {resp.reason}")
+        return body
+
+
+@lru_cache(maxsize=256)
 def resolve_icon(icon_key, size=64, tint="FFFFFF", cache_dir="/tmp/diagram_icons"):
     """Resolve an icon key to a local PNG file path.
 
-    Resolution: local file path → Iconify API → None on failure.
+    Resolution: local file path → DIAGRAM_ICON_DIR bundle → cached SVG →
+    Iconify API → None on failure.
+    Results (including failures) are memoized per process, so shapes that
+    share an icon key download and rasterize it once.
     """
     os.makedirs(cache_dir, exist_ok=True)
 
@@ -403,14 +656,13 @@ def resolve_icon(icon_key, size=64, tint="FFFFFF", cache_dir="/tmp/diagram_icons
             return icon_key if os.path.exists(icon_key) else None
         if icon_key.endswith(".svg") and os.path.exists(icon_key):
             try:
-                import cairosvg
+                render = _svg_renderer()
                 png_path = os.path.join(cache_dir, os.path.basename(icon_key) + ".png")
                 with open(icon_key, "r") as f:
                     svg_data = f.read()
                 if tint:
                     svg_data = svg_data.replace("currentColor", f"#{tint}")
-                cairosvg.svg2png(bytestring=svg_data.encode(), write_to=png_path,
-                                 output_width=size, output_height=size)
+                render(svg_data, png_path, size)
                 return png_path
             except ImportError:
                 return None
@@ -418,26 +670,37 @@ def resolve_icon(icon_key, size=64, tint="FFFFFF", cache_dir="/tmp/diagram_icons
 
     # Iconify API (prefix:name)
     if ":" in icon_key:
-        import urllib.request
         tint_suffix = f"_{tint}" if tint else "_orig"
         cache_name = f"{icon_key.replace(':', '_')}_{size}{tint_suffix}.png"
         png_path = os.path.join(cache_dir, cache_name)
         if os.path.exists(png_path):
             return png_path
+        # Untinted SVG, kept so other tints re-rasterize without a download
+        svg_path = os.path.join(cache_dir, f"{icon_key.replace(':', '_')}_{size}.svg")
         try:
-            import cairosvg
+            render = _svg_renderer()
             prefix, name = icon_key.split(":", 1)
-            url = f"https://api.iconify.design/{prefix}/{name}.svg?width={size}&height={size}"
-            req = urllib.request.Request(url, headers={"User-Agent": "python-pptx-diagrams/1.0"})
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                svg_data = resp.read().decode("utf-8")
+            # Offline icon set first, then the download cache, then the network
+            svg_data = None
+            bundled = _ICON_BUNDLE_DIR and os.path.join(_ICON_BUNDLE_DIR, prefix, f"{name}.svg")
+            for local_path in (bundled, svg_path):
+                if local_path and os.path.exists(local_path):
+                    with open(local_path, "r", encoding="utf-8") as f:
+                        svg_data = f.read()
+                    break
+            if svg_data is None:
+                svg_data = _iconify_get(
+                    f"/{prefix}/{name}.svg?width={size}&height={size}").decode("utf-8")
+                tmp_path = f"{svg_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(svg_data)
+                os.replace(tmp_path, svg_path)
             if tint:
                 svg_data = svg_data.replace("currentColor", f"#{tint}")
-            cairosvg.svg2png(bytestring=svg_data.encode(), write_to=png_path,
-                             output_width=size, output_height=size)
+            render(svg_data, png_path, size)
             return png_path
         except ImportError:
-            print(f"  Warning: cairosvg not installed, skipping icon '{icon_key}'")
+            print(f"  Warning: no SVG rasterizer (cairosvg or resvg_py) installed, skipping icon '{icon_key}'")
             return None
         except Exception as e:
             print(f"  Warning: Failed to resolve icon '{icon_key}': {e}")
@@ -446,15 +709,27 @@ def resolve_icon(icon_key, size=64, tint="FFFFFF", cache_dir="/tmp/diagram_icons
     return None
 
 
-def enrich_shape_with_icon(slide, shape_name, icon_path, icon_size_inches=0.35):
-    """Add an icon image above the text label inside a named shape."""
+# Precomputed Clark-notation tag used to adjust a shape's label inset
+_BODYPR_TAG = "{http://schemas.openxmlformats.org/drawingml/2006/main}bodyPr"
+
+
+def enrich_shape_with_icon(slide, shape_name, icon_path, icon_size_inches=0.35,
+                           shapes_by_name=None):
+    """Add an icon image above the text label inside a named shape.
+
+    Pass shapes_by_name (see _shapes_by_name) when enriching many shapes to
+    avoid scanning the whole shape tree for each one.
+    """
     from pptx.util import Inches
 
-    target = None
-    for shape in slide.shapes:
-        if shape.name == shape_name:
-            target = shape
-            break
+    if shapes_by_name is not None:
+        target = shapes_by_name.get(shape_name)
+    else:
+        target = None
+        for shape in slide.shapes:
+            if shape.name == shape_name:
+                target = shape
+                break
     if target is None:
         return False
 
@@ -470,8 +745,7 @@ def enrich_shape_with_icon(slide, shape_name, icon_path, icon_size_inches=0.35):
 
     # Push text below icon
     if target.has_text_frame:
-        ns = "http://schemas.openxmlformats.org/drawingml/2006/main"
-        body_pr = target.text_frame._txBody.find(f"{{{ns}}}bodyPr")
+        body_pr = target.text_frame._txBody.find(_BODYPR_TAG)
         if body_pr is not None:
             body_pr.set("tIns", "365760")  # 0.4" top inset
             body_pr.set("anchor", "b")     # anchor text to bottom
@@ -479,26 +753,88 @@ def enrich_shape_with_icon(slide, shape_name, icon_path, icon_size_inches=0.35):
     return True
 
 
-def enrich_pptx_with_icons(pptx_path, icon_map, output_path=None,
-                            icon_size=64, icon_size_inches=0.35,
-                            tint="FFFFFF", slide_index=0):
-    """Post-process a PPTX to add icons to named shapes."""
-    prs_icons = Presentation(pptx_path)
-    slide = prs_icons.slides[slide_index]
-    results = []
+def _shapes_by_name(slide):
+    """Map shape name -> first shape with that name, in one pass over the slide."""
+    by_name = {}
+    for shape in slide.shapes:
+        by_name.setdefault(shape.name, shape)
+    return by_name
+
 
+def enrich_slide_with_icons(slide, icon_map, icon_size=64,
+                            icon_size_inches=0.35, tint="FFFFFF"):
+    """Add icons to named shapes on an in-memory slide (no save/reload).
+
+    Icons are resolved (downloaded and rasterized) on a thread pool; the
+    slide itself is only modified on the calling thread.
+    """
+    keys = list(dict.fromkeys(icon_map.values()))
+    with ThreadPoolExecutor(max_workers=min(_ICON_WORKERS, len(keys)) or 1) as pool:
+        resolved = dict(zip(keys, pool.map(
+            lambda key: resolve_icon(key, size=icon_size, tint=tint), keys)))
+
+    by_name = _shapes_by_name(slide)
+    results = []
     for shape_name, icon_key in icon_map.items():
-        icon_path = resolve_icon(icon_key, size=icon_size, tint=tint)
+        icon_path = resolved[icon_key]
         if icon_path:
-            ok = enrich_shape_with_icon(slide, shape_name, icon_path, icon_size_inches)
+            ok = enrich_shape_with_icon(slide, shape_name, icon_path, icon_size_inches,
+                                        shapes_by_name=by_name)
             results.append((shape_name, ok))
         else:
             results.append((shape_name, False))
+    return results
+
 
-    prs_icons.save(output_path or pptx_path)
+def enrich_pptx_with_icons(pptx_path, icon_map, output_path=None,
+                            icon_size=64, icon_size_inches=0.35,
+                            tint="FFFFFF", slide_index=0):
+    """Post-process a PPTX to add icons to named shapes."""
+    prs_icons = Presentation(pptx_path)
+    slide = prs_icons.slides[slide_index]
+    results = enrich_slide_with_icons(slide, icon_map, icon_size=icon_size,
+                                      icon_size_inches=icon_size_inches, tint=tint)
+    save_presentation(prs_icons, output_path or pptx_path)
     return results
 
 
+class _StoredZipModule:
+    """Stand-in for the zipfile module that maps ZIP_DEFLATED to ZIP_STORED."""
+    ZIP_DEFLATED = zipfile.ZIP_STORED
+
+    def __getattr__(self, name):
+        return getattr(zipfile, name)
+
+
+def save_presentation(prs, path):
+    """Save a presentation, skipping DEFLATE when DIAGRAM_FAST_SAVE is set.
+
+    Stored (uncompressed) archives are larger but quicker to write, which
+    suits repeated local regeneration; release builds leave the variable unset.
+    python-pptx always asks zipfile for ZIP_DEFLATED, so fast saves swap in
+    _StoredZipModule for the duration of the save rather than compressing
+    first and rewriting the archive afterwards.
+    """
+    if not os.environ.get("DIAGRAM_FAST_SAVE"):
+        prs.save(path)
+        return
+    from pptx.opc import serialized
+    if getattr(serialized, "zipfile", None) is not zipfile:
+        # Unknown python-pptx layout: compress, then rewrite stored
+        buf = BytesIO()
+        prs.save(buf)
+        with zipfile.ZipFile(buf) as zin, \
+                zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zout:
+            for info in zin.infolist():
+                zout.writestr(info.filename, zin.read(info))
+        return
+    serialized.zipfile = _StoredZipModule()
+    try:
+        prs.save(path)
+    finally:
+        serialized.zipfile = zipfile
+
+
 def main():
     prs = Presentation()
     prs.slide_width = Emu(SLIDE_W)
@@ -508,107 +844,47 @@ def main():
     sid = 2
 
     # Background
-    bg_xml = f'''
-    <p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-          xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
-      <p:nvSpPr><p:cNvPr id="{sid}" name="Background"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
-      <p:spPr>
-        <a:xfrm><a:off x="0" y="0"/><a:ext cx="{SLIDE_W}" cy="{SLIDE_H}"/></a:xfrm>
-        <a:prstGeom prst="rect"><a:avLst/></a:prstGeom>
-        <a:solidFill><a:srgbClr val="F5F6FA"/></a:solidFill>
-        <a:ln><a:noFill/></a:ln>
-      </p:spPr>
-      <p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:endParaRPr lang="en-US" dirty="0"/></a:p></p:txBody>
-    </p:sp>'''
-    spTree.insert(2, etree.fromstring(bg_xml.strip()))
+    frags = [_BG_TMPL(sid=sid, cx=SLIDE_W, cy=SLIDE_H)]
     sid += 1
 
     # Lane backgrounds
     usable_h = SLIDE_H - TITLE_H - TITLE_GAP - BOTTOM_MARGIN
     lane_h = usable_h // len(LANES)
-    lane_w = SLIDE_W - 2 * LANE_MARGIN_X
     lane_y_positions = []
 
     for i, (label, fill, border) in enumerate(LANES):
         y = TITLE_H + TITLE_GAP + i * lane_h
         lane_y_positions.append(y)
-        lane_xml = f'''
-        <p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-              xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
-          <p:nvSpPr><p:cNvPr id="{sid}" name="Lane {label}"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
-          <p:spPr>
-            <a:xfrm><a:off x="{LANE_MARGIN_X}" y="{y}"/><a:ext cx="{lane_w}" cy="{lane_h}"/></a:xfrm>
-            <a:prstGeom prst="rect"><a:avLst/></a:prstGeom>
-            <a:solidFill><a:srgbClr val="{fill}"/></a:solidFill>
-            <a:ln w="12700"><a:solidFill><a:srgbClr val="{border}"/></a:solidFill></a:ln>
-          </p:spPr>
-          <p:txBody>
-            <a:bodyPr wrap="square" anchor="t" lIns="91440" tIns="91440"><a:normAutofit/></a:bodyPr>
-            <a:lstStyle/>
-            <a:p><a:pPr algn="l"/>
-              <a:r><a:rPr lang="en-US" sz="900" b="1" dirty="0">
-                <a:solidFill><a:srgbClr val="888888"/></a:solidFill>
-                <a:latin typeface="Calibri"/>
-              </a:rPr><a:t>{label}</a:t></a:r>
-            </a:p>
-          </p:txBody>
-        </p:sp>'''
-        spTree.append(etree.fromstring(lane_xml.strip()))
+        lane_xml = _LANE_TMPL(
+            sid=sid, label=escape(label, _XML_ENTITIES), x=LANE_MARGIN_X, y=y, cx=LANE_W, cy=lane_h,
+            fill=fill, border=border)
+        frags.append(lane_xml)
         sid += 1
 
     # Title bar
-    title_xml = f'''
-    <p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-          xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
-      <p:nvSpPr><p:cNvPr id="{sid}" name="TitleBar"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
-      <p:spPr>
-        <a:xfrm><a:off x="{LANE_MARGIN_X}" y="0"/><a:ext cx="{lane_w}" cy="{TITLE_H}"/></a:xfrm>
-        <a:prstGeom prst="rect"><a:avLst/></a:prstGeom>
-        <a:gradFill>
-          <a:gsLst>
-            <a:gs pos="0"><a:srgbClr val="1F3864"/></a:gs>
-            <a:gs pos="100000"><a:srgbClr val="16294A"/></a:gs>
-          </a:gsLst>
-          <a:lin ang="0" scaled="0"/>
-        </a:gradFill>
-        <a:ln><a:noFill/></a:ln>
-      </p:spPr>
-      <p:txBody>
-        <a:bodyPr wrap="square" anchor="ctr"><a:normAutofit/></a:bodyPr>
-        <a:lstStyle/>
-        <a:p><a:pPr algn="ctr"/>
-          <a:r><a:rPr lang="en-US" sz="2200" b="1" dirty="0">
-            <a:solidFill><a:srgbClr val="FFFFFF"/></a:solidFill>
-            <a:latin typeface="Calibri"/>
-          </a:rPr><a:t>{TITLE}</a:t></a:r>
-        </a:p>
-      </p:txBody>
-    </p:sp>'''
-    spTree.append(etree.fromstring(title_xml.strip()))
+    title_xml = _TITLE_TMPL(sid=sid, x=LANE_MARGIN_X, cx=LANE_W, cy=TITLE_H,
+                            title=escape(TITLE, _XML_ENTITIES))
+    frags.append(title_xml)
     sid += 1
 
     # Compute component positions
-    lane_comps = {}
-    for cid, text, preset, lane_idx, style in COMPONENTS:
-        lane_comps.setdefault(lane_idx, []).append((cid, text, preset, style))
-
-    positions = {}  # cid -> (x, y, cx, cy)
-    for lane_idx, comps in lane_comps.items():
-        xs = center_row(len(comps), COMP_W, COL_GAP)
-        ly = lane_y_positions[lane_idx]
-        comp_y = ly + (lane_h - COMP_H) // 2
-        for i, (cid, text, preset, style) in enumerate(comps):
-            positions[cid] = (xs[i], comp_y, COMP_W, COMP_H)
+    lane_members = {}  # lane_idx -> component indices
+    for i, (cid, text, preset, lane_idx, style_xml) in enumerate(_COMPS):
+        lane_members.setdefault(lane_idx, []).append(i)
+
+    positions = [None] * len(_COMPS)  # component index -> (x, y, cx, cy)
+    anchors = [None] * len(_COMPS)    # -> (center x, top y, bottom y) for arrows
+    for lane_idx, members in lane_members.items():
+        comp_y = lane_y_positions[lane_idx] + (lane_h - COMP_H) // 2
+        for i, x in zip(members, center_row(len(members), COMP_W, COL_GAP)):
+            positions[i] = (x, comp_y, COMP_W, COMP_H)
+            anchors[i] = (x + COMP_W // 2, comp_y, comp_y + COMP_H)
 
     # Arrows (render before shapes) — orthogonal routing
-    for src_id, tgt_id, color in ARROWS:
-        sx, sy, scx, scy = positions[src_id]
-        tx, ty, tcx, tcy = positions[tgt_id]
-        x1 = sx + scx // 2    # source bottom center
-        y1 = sy + scy
-        x2 = tx + tcx // 2    # target top center
-        y2 = ty
-        mid_y = y1 + (y2 - y1) // 2
+    for src, tgt, color in _ARROWS:
+        x1, _, y1 = anchors[src]    # source bottom center
+        x2, y2, _ = anchors[tgt]    # target top center
+        mid_y = (y1 + y2) // 2
         if x1 == x2:
             waypoints = [(x1, y1), (x2, y2)]
         else:
@@ -616,50 +892,15 @@ def main():
         xml = build_routed_connector_xml(
             waypoints, sid, f"Arrow {sid}",
             color=color, width=19050, tail="stealth", radius=120000)
-        spTree.append(etree.fromstring(xml))
+        frags.append(xml)
         sid += 1
 
     # Component shapes (on top)
-    for cid, text, preset, lane_idx, style in COMPONENTS:
-        x, y, cx, cy = positions[cid]
-        fill, border = STYLE_COLORS[style]
-        comp_xml = f'''
-        <p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-              xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
-          <p:nvSpPr>
-            <p:cNvPr id="{sid}" name="{cid}"/>
-            <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
-            <p:nvPr/>
-          </p:nvSpPr>
-          <p:spPr>
-            <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
-            <a:prstGeom prst="{preset}"><a:avLst/></a:prstGeom>
-            <a:gradFill>
-              <a:gsLst>
-                <a:gs pos="0"><a:srgbClr val="{fill}"/></a:gs>
-                <a:gs pos="100000"><a:srgbClr val="{border}"/></a:gs>
-              </a:gsLst>
-              <a:lin ang="5400000" scaled="0"/>
-            </a:gradFill>
-            <a:ln w="25400"><a:solidFill><a:srgbClr val="{border}"/></a:solidFill><a:round/></a:ln>
-            <a:effectLst>
-              <a:outerShdw blurRad="50800" dist="38100" dir="5400000" algn="tl" rotWithShape="0">
-                <a:srgbClr val="000000"><a:alpha val="35000"/></a:srgbClr>
-              </a:outerShdw>
-            </a:effectLst>
-          </p:spPr>
-          <p:txBody>
-            <a:bodyPr wrap="square" anchor="ctr"><a:normAutofit/></a:bodyPr>
-            <a:lstStyle/>
-            <a:p><a:pPr algn="ctr"/>
-              <a:r><a:rPr lang="en-US" sz="1200" b="1" dirty="0">
-                <a:solidFill><a:srgbClr val="FFFFFF"/></a:solidFill>
-                <a:latin typeface="Calibri"/>
-              </a:rPr><a:t>{text}</a:t></a:r>
-            </a:p>
-          </p:txBody>
-        </p:sp>'''
-        spTree.append(etree.fromstring(comp_xml.strip()))
+    for (cid, text, preset, lane_idx, style_xml), (x, y, cx, cy) in zip(_COMPS, positions):
+        comp_xml = _COMP_TMPL(
+            sid=sid, cid=cid, x=x, y=y, cx=cx, cy=cy, preset=preset,
+            style_xml=style_xml, text=text)
+        frags.append(comp_xml)
         sid += 1
 
     # Legend (last in z-order — renders on top)
@@ -677,22 +918,27 @@ def main():
     # Narrower width (1.2") to fit left of User DB (which starts at x=1.5")
     legend_xmls, sid = make_legend_xml(sid, legend_entries, line_entries,
                                         x=137160, legend_w=1097280)  # 0.15" left, 1.2" wide
-    for xml_str in legend_xmls:
-        spTree.append(etree.fromstring(xml_str))
+    frags.extend(legend_xmls)
 
-    output = "architecture_diagram.pptx"
-    prs.save(output)
-    print(f"Saved: {os.path.abspath(output)}")
+    # One parse for every shape, then move them into the slide in z-order
+    shapes = etree.fromstring(_SHAPES_WRAPPER % "".join(frags), _PARSER)
+    spTree.extend(list(shapes))
 
-    # --- Icon enrichment (optional post-processing) ---
+    # --- Icon enrichment (optional) ---
+    # Done on the in-memory slide so the deck is serialized once, not saved,
+    # reopened and saved again.
     if ICONS:
         try:
-            results = enrich_pptx_with_icons(output, ICONS, tint="FFFFFF")
+            results = enrich_slide_with_icons(slide, ICONS, tint="FFFFFF")
             added = sum(1 for _, ok in results if ok)
             print(f"Icons: {added}/{len(ICONS)} added successfully")
         except ImportError:
             print("Note: Install cairosvg for icon support (pip install cairosvg)")
 
+    output = "architecture_diagram.pptx"
+    save_presentation(prs, output)
+    print(f"Saved: {os.path.abspath(output)}")
+
 
 if __name__ == "__main__":
     main()
@@ -29,6 +29,7 @@ Run: pip install python-pptx lxml && python branching_flowchart.py && open branc
 from pptx import Presentation
 from pptx.util import Emu
 from lxml import etree
+from functools import lru_cache
 import os
 
 SLIDE_W, SLIDE_H = 9144000, 5143500
@@ -55,67 +56,51 @@ _TOTAL_W = 4 * SW + 3 * GAP_H
 _LEFT = (SLIDE_W - _TOTAL_W) // 2
 MARGIN_TOP = 700000
 
+# Synthetic root for parsing every shape fragment in a single fromstring() call;
+# the fragments themselves carry no namespace declarations
+_SHAPES_WRAPPER = f'<p:spTree xmlns:p="{NS_P}" xmlns:a="{NS_A}">%s</p:spTree>'
+
 
 # ═══════════════════════════════════════════════════════════════════
 # Orthogonal connector with curved elbows (custom geometry)
 # ═══════════════════════════════════════════════════════════════════
 
-def build_routed_connector_xml(waypoints, sid, name="Connector",
-                                color="888888", width=19050,
-                                dash="solid", tail="triangle",
-                                head="none", radius=150000):
-    xs = [p[0] for p in waypoints]
-    ys = [p[1] for p in waypoints]
-    min_x, min_y = min(xs), min(ys)
-    max_x, max_y = max(xs), max(ys)
-    bbox_w = max(max_x - min_x, 1)
-    bbox_h = max(max_y - min_y, 1)
+# Path commands for build_routed_connector_xml (integer-only %-formatting)
+_MV = '<a:moveTo><a:pt x="%d" y="%d"/></a:moveTo>'
+_LN = '<a:lnTo><a:pt x="%d" y="%d"/></a:lnTo>'
+_ARC = '<a:arcTo wR="%d" hR="%d" stAng="%d" swAng="%d"/>'
 
-    pts = [(x - min_x, y - min_y) for x, y in waypoints]
+# Segment directions as ordinals: R=0, L=1, D=2, U=3
+_R, _L, _D, _U = range(4)
 
-    def direction(a, b):
-        dx, dy = b[0] - a[0], b[1] - a[1]
-        if dx > 0: return 'R'
-        if dx < 0: return 'L'
-        if dy > 0: return 'D'
-        return 'U'
-
-    ARC = {
-        ('R', 'D'): (16200000, 5400000),   ('R', 'U'): (5400000, -5400000),
-        ('L', 'D'): (16200000, -5400000),  ('L', 'U'): (5400000, 5400000),
-        ('D', 'R'): (10800000, -5400000),  ('D', 'L'): (0, 5400000),
-        ('U', 'R'): (10800000, 5400000),   ('U', 'L'): (0, -5400000),
-    }
+# Direction keyed by (sign dx, sign dy); horizontal wins on diagonals
+_DIR = {
+    (1, 0): _R, (1, 1): _R, (1, -1): _R,
+    (-1, 0): _L, (-1, 1): _L, (-1, -1): _L,
+    (0, 1): _D, (0, -1): _U, (0, 0): _U,
+}
 
-    path_cmds = [f'<a:moveTo><a:pt x="{pts[0][0]}" y="{pts[0][1]}"/></a:moveTo>']
-
-    for i in range(1, len(pts)):
-        if i < len(pts) - 1:
-            prev_dir = direction(pts[i-1], pts[i])
-            next_dir = direction(pts[i], pts[i+1])
-            seg_before = abs(pts[i][0]-pts[i-1][0]) + abs(pts[i][1]-pts[i-1][1])
-            seg_after = abs(pts[i+1][0]-pts[i][0]) + abs(pts[i+1][1]-pts[i][1])
-            r = min(radius, seg_before // 2, seg_after // 2)
-
-            bx, by = pts[i][0], pts[i][1]
-            if prev_dir == 'R': bx -= r
-            elif prev_dir == 'L': bx += r
-            elif prev_dir == 'D': by -= r
-            elif prev_dir == 'U': by += r
-            path_cmds.append(f'<a:lnTo><a:pt x="{bx}" y="{by}"/></a:lnTo>')
-
-            st, sw = ARC[(prev_dir, next_dir)]
-            path_cmds.append(f'<a:arcTo wR="{r}" hR="{r}" stAng="{st}" swAng="{sw}"/>')
-        else:
-            path_cmds.append(
-                f'<a:lnTo><a:pt x="{pts[i][0]}" y="{pts[i][1]}"/></a:lnTo>'
-            )
+# Unit step back along each direction, used to stop short of an elbow
+_BACK_DX = (-1, 1, 0, 0)
+_BACK_DY = (0, 0, -1, 1)
 
-    path_data = ''.join(path_cmds)
-    head_xml = f'<a:headEnd type="{head}" w="med" len="med"/>' if head != "none" else '<a:headEnd type="none"/>'
-    tail_xml = f'<a:tailEnd type="{tail}" w="med" len="med"/>' if tail != "none" else '<a:tailEnd type="none"/>'
+# (stAng, swAng) of the elbow arc, flat 4x4 table indexed by
+# incoming * 4 + outgoing; None marks straight-through or reversing pairs
+_ARC_ANGLES = (
+    None, None, (16200000, 5400000), (5400000, -5400000),     # from R
+    None, None, (16200000, -5400000), (5400000, 5400000),     # from L
+    (10800000, -5400000), (0, 5400000), None, None,           # from D
+    (10800000, 5400000), (0, -5400000), None, None,           # from U
+)
+
+
+def _direction(a, b):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    return _DIR[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))]
 
-    return f'''<p:sp xmlns:p="{NS_P}" xmlns:a="{NS_A}">
+
+# Routed connector; path_data holds the moveTo/lnTo/arcTo commands
+_CONN_TMPL = '''<p:sp>
   <p:nvSpPr>
     <p:cNvPr id="{sid}" name="{name}"/>
     <p:cNvSpPr/>
@@ -145,24 +130,58 @@ def build_routed_connector_xml(waypoints, sid, name="Connector",
     </a:ln>
   </p:spPr>
   <p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:endParaRPr lang="en-US" dirty="0"/></a:p></p:txBody>
-</p:sp>'''
+</p:sp>'''.format
+
+
+def build_routed_connector_xml(waypoints, sid, name="Connector",
+                                color="888888", width=19050,
+                                dash="solid", tail="triangle",
+                                head="none", radius=150000):
+    xs = [p[0] for p in waypoints]
+    ys = [p[1] for p in waypoints]
+    min_x, min_y = min(xs), min(ys)
+    max_x, max_y = max(xs), max(ys)
+    bbox_w = max(max_x - min_x, 1)
+    bbox_h = max(max_y - min_y, 1)
+
+    pts = [(x - min_x, y - min_y) for x, y in waypoints]
+
+    # Direction and half-length of each segment, computed once and shared by
+    # the elbows at both of its ends
+    n = len(pts)
+    dirs = [_direction(a, b) for a, b in zip(pts, pts[1:])]
+    halves = [(abs(b[0] - a[0]) + abs(b[1] - a[1])) // 2 for a, b in zip(pts, pts[1:])]
+
+    path_cmds = [None] * max(1, 2 * n - 2)
+    path_cmds[0] = _MV % pts[0]
+    j = 1
+    for i in range(1, n - 1):
+        prev_dir, next_dir = dirs[i-1], dirs[i]
+        r = min(radius, halves[i-1], halves[i])
+        st, sw = _ARC_ANGLES[prev_dir * 4 + next_dir]
+        path_cmds[j] = _LN % (pts[i][0] + _BACK_DX[prev_dir] * r,
+                              pts[i][1] + _BACK_DY[prev_dir] * r)
+        path_cmds[j + 1] = _ARC % (r, r, st, sw)
+        j += 2
+    if n > 1:  # a single waypoint is just the moveTo
+        path_cmds[j] = _LN % pts[-1]
+
+    path_data = ''.join(path_cmds)
+    head_xml = f'<a:headEnd type="{head}" w="med" len="med"/>' if head != "none" else '<a:headEnd type="none"/>'
+    tail_xml = f'<a:tailEnd type="{tail}" w="med" len="med"/>' if tail != "none" else '<a:tailEnd type="none"/>'
+
+    return _CONN_TMPL(
+        sid=sid, name=name, min_x=min_x, min_y=min_y, bbox_w=bbox_w, bbox_h=bbox_h,
+        path_data=path_data, width=width, color=color, dash=dash,
+        head_xml=head_xml, tail_xml=tail_xml)
 
 
 # ═══════════════════════════════════════════════════════════════════
 # Shape + label helpers
 # ═══════════════════════════════════════════════════════════════════
 
-def make_shape_xml(sid, name, text, preset, x, y, cx, cy, fill, border):
-    return f'''<p:sp xmlns:p="{NS_P}" xmlns:a="{NS_A}">
-  <p:nvSpPr>
-    <p:cNvPr id="{sid}" name="{name}"/>
-    <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
-    <p:nvPr/>
-  </p:nvSpPr>
-  <p:spPr>
-    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
-    <a:prstGeom prst="{preset}"><a:avLst/></a:prstGeom>
-    <a:gradFill>
+# Gradient fill, outline and shadow for a (fill, border) pair; see _shape_style_xml
+_SHAPE_STYLE_TMPL = '''<a:gradFill>
       <a:gsLst>
         <a:gs pos="0"><a:srgbClr val="{fill}"/></a:gs>
         <a:gs pos="100000"><a:srgbClr val="{border}"/></a:gs>
@@ -174,7 +193,26 @@ def make_shape_xml(sid, name, text, preset, x, y, cx, cy, fill, border):
       <a:outerShdw blurRad="50800" dist="38100" dir="5400000" algn="tl" rotWithShape="0">
         <a:srgbClr val="000000"><a:alpha val="35000"/></a:srgbClr>
       </a:outerShdw>
-    </a:effectLst>
+    </a:effectLst>'''.format
+
+
+@lru_cache(maxsize=None)
+def _shape_style_xml(fill, border):
+    """Style block for _SHAPE_TMPL, formatted once per color pair."""
+    return _SHAPE_STYLE_TMPL(fill=fill, border=border)
+
+
+# Shape with gradient fill, shadow and centered text
+_SHAPE_TMPL = '''<p:sp>
+  <p:nvSpPr>
+    <p:cNvPr id="{sid}" name="{name}"/>
+    <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
+    <p:nvPr/>
+  </p:nvSpPr>
+  <p:spPr>
+    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
+    <a:prstGeom prst="{preset}"><a:avLst/></a:prstGeom>
+    {style_xml}
   </p:spPr>
   <p:txBody>
     <a:bodyPr wrap="square" anchor="ctr"><a:normAutofit/></a:bodyPr>
@@ -186,11 +224,17 @@ def make_shape_xml(sid, name, text, preset, x, y, cx, cy, fill, border):
       </a:rPr><a:t>{text}</a:t></a:r>
     </a:p>
   </p:txBody>
-</p:sp>'''
+</p:sp>'''.format
 
 
-def make_label_xml(sid, text, x, y, color="666666", sz=900):
-    return f'''<p:sp xmlns:p="{NS_P}" xmlns:a="{NS_A}">
+def make_shape_xml(sid, name, text, preset, x, y, cx, cy, fill, border):
+    return _SHAPE_TMPL(
+        sid=sid, name=name, x=x, y=y, cx=cx, cy=cy, preset=preset,
+        style_xml=_shape_style_xml(fill, border), text=text)
+
+
+# Borderless bold text label
+_LABEL_TMPL = '''<p:sp>
   <p:nvSpPr><p:cNvPr id="{sid}" name="Label {sid}"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
   <p:spPr>
     <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="342900" cy="304800"/></a:xfrm>
@@ -207,7 +251,12 @@ def make_label_xml(sid, text, x, y, color="666666", sz=900):
       </a:rPr><a:t>{text}</a:t></a:r>
     </a:p>
   </p:txBody>
-</p:sp>'''
+</p:sp>'''.format
+
+
+def make_label_xml(sid, text, x, y, color="666666", sz=900):
+    return _LABEL_TMPL(
+        sid=sid, x=x, y=y, sz=sz, color=color, text=text)
 
 
 def main():
@@ -219,7 +268,7 @@ def main():
     sid = 2
 
     # Background
-    bg_xml = f'''<p:sp xmlns:p="{NS_P}" xmlns:a="{NS_A}">
+    bg_xml = f'''<p:sp>
   <p:nvSpPr><p:cNvPr id="{sid}" name="Background"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
   <p:spPr>
     <a:xfrm><a:off x="0" y="0"/><a:ext cx="{SLIDE_W}" cy="{SLIDE_H}"/></a:xfrm>
@@ -235,11 +284,11 @@ def main():
   </p:spPr>
   <p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:endParaRPr lang="en-US" dirty="0"/></a:p></p:txBody>
 </p:sp>'''
-    spTree.insert(2, etree.fromstring(bg_xml))
+    frags = [bg_xml]
     sid += 1
 
     # Title
-    title_xml = f'''<p:sp xmlns:p="{NS_P}" xmlns:a="{NS_A}">
+    title_xml = f'''<p:sp>
   <p:nvSpPr><p:cNvPr id="{sid}" name="Title"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
   <p:spPr>
     <a:xfrm><a:off x="457200" y="152400"/><a:ext cx="8229600" cy="457200"/></a:xfrm>
@@ -257,7 +306,7 @@ def main():
     </a:p>
   </p:txBody>
 </p:sp>'''
-    spTree.append(etree.fromstring(title_xml))
+    frags.append(title_xml)
     sid += 1
 
     # ── Shape positions ──────────────────────────────────────────
@@ -285,101 +334,107 @@ def main():
         "reject":   ("Reject\nRequest", "roundRect",    col4_x, row1_y + (DH - SH) // 2, SW, SH, *CLR_ALT),
     }
 
-    # Helper to get center/edge points
-    def cx_of(key): return shapes[key][2] + shapes[key][4] // 2
-    def cy_of(key): return shapes[key][3] + shapes[key][5] // 2
-    def right_of(key): return shapes[key][2] + shapes[key][4]
-    def left_of(key): return shapes[key][2]
-    def top_of(key): return shapes[key][3]
-    def bot_of(key): return shapes[key][3] + shapes[key][5]
+    # Center/edge coordinates per shape, computed once for the connectors below
+    cx_of, cy_of, right_of, left_of, top_of, bot_of = {}, {}, {}, {}, {}, {}
+    for key, (_, _, x, y, cx, cy, _, _) in shapes.items():
+        cx_of[key] = x + cx // 2
+        cy_of[key] = y + cy // 2
+        right_of[key] = x + cx
+        left_of[key] = x
+        top_of[key] = y
+        bot_of[key] = y + cy
 
     # ── Connectors (render before shapes for z-order) ──
 
     # 1. START → VALIDATE (straight horizontal)
-    spTree.append(etree.fromstring(build_routed_connector_xml(
-        [(right_of("start"), cy_of("start")),
-         (left_of("validate"), cy_of("validate"))],
-        sid, "Arrow Start-Validate", CLR_ARROW, tail="triangle", radius=R)))
+    frags.append(build_routed_connector_xml(
+        [(right_of["start"], cy_of["start"]),
+         (left_of["validate"], cy_of["validate"])],
+        sid, "Arrow Start-Validate", CLR_ARROW, tail="triangle", radius=R))
     sid += 1
 
     # 2. VALIDATE → VALID? (straight horizontal)
-    spTree.append(etree.fromstring(build_routed_connector_xml(
-        [(right_of("validate"), cy_of("validate")),
-         (left_of("valid"), cy_of("valid"))],
-        sid, "Arrow Validate-Valid", CLR_ARROW, tail="triangle", radius=R)))
+    frags.append(build_routed_connector_xml(
+        [(right_of["validate"], cy_of["validate"]),
+         (left_of["valid"], cy_of["valid"])],
+        sid, "Arrow Validate-Valid", CLR_ARROW, tail="triangle", radius=R))
     sid += 1
 
     # 3. VALID? → REJECT (YES=right exit → right, NO path)
-    spTree.append(etree.fromstring(build_routed_connector_xml(
-        [(right_of("valid"), cy_of("valid")),
-         (left_of("reject"), cy_of("reject"))],
-        sid, "Arrow Valid-Reject", CLR_NO, tail="triangle", radius=R)))
+    frags.append(build_routed_connector_xml(
+        [(right_of["valid"], cy_of["valid"]),
+         (left_of["reject"], cy_of["reject"])],
+        sid, "Arrow Valid-Reject", CLR_NO, tail="triangle", radius=R))
     sid += 1
 
     # 4. VALID? → PROCESS (YES=bottom exit → down then left, L-shape)
-    mid_y = bot_of("valid") + (top_of("process") - bot_of("valid")) // 2
-    spTree.append(etree.fromstring(build_routed_connector_xml(
-        [(cx_of("valid"), bot_of("valid")),
-         (cx_of("valid"), mid_y),
-         (cx_of("process"), mid_y),
-         (cx_of("process"), top_of("process"))],
-        sid, "Arrow Valid-Process", CLR_YES, tail="triangle", radius=R)))
+    mid_y = bot_of["valid"] + (top_of["process"] - bot_of["valid"]) // 2
+    frags.append(build_routed_connector_xml(
+        [(cx_of["valid"], bot_of["valid"]),
+         (cx_of["valid"], mid_y),
+         (cx_of["process"], mid_y),
+         (cx_of["process"], top_of["process"])],
+        sid, "Arrow Valid-Process", CLR_YES, tail="triangle", radius=R))
     sid += 1
 
     # 5. PROCESS → COMPLETE? (straight horizontal)
-    spTree.append(etree.fromstring(build_routed_connector_xml(
-        [(right_of("process"), cy_of("process")),
-         (left_of("complete"), cy_of("complete"))],
-        sid, "Arrow Process-Complete", CLR_ARROW, tail="triangle", radius=R)))
+    frags.append(build_routed_connector_xml(
+        [(right_of["process"], cy_of["process"]),
+         (left_of["complete"], cy_of["complete"])],
+        sid, "Arrow Process-Complete", CLR_ARROW, tail="triangle", radius=R))
     sid += 1
 
     # 6. COMPLETE? → DONE (YES, straight horizontal)
-    spTree.append(etree.fromstring(build_routed_connector_xml(
-        [(right_of("complete"), cy_of("complete")),
-         (left_of("done"), cy_of("done"))],
-        sid, "Arrow Complete-Done", CLR_YES, tail="triangle", radius=R)))
+    frags.append(build_routed_connector_xml(
+        [(right_of["complete"], cy_of["complete"]),
+         (left_of["done"], cy_of["done"])],
+        sid, "Arrow Complete-Done", CLR_YES, tail="triangle", radius=R))
     sid += 1
 
     # 7. COMPLETE? → PROCESS (NO, loop-back: down, left, up)
-    loop_y = bot_of("complete") + 300000
-    spTree.append(etree.fromstring(build_routed_connector_xml(
-        [(cx_of("complete"), bot_of("complete")),
-         (cx_of("complete"), loop_y),
-         (cx_of("process"), loop_y),
-         (cx_of("process"), bot_of("process"))],
+    loop_y = bot_of["complete"] + 300000
+    frags.append(build_routed_connector_xml(
+        [(cx_of["complete"], bot_of["complete"]),
+         (cx_of["complete"], loop_y),
+         (cx_of["process"], loop_y),
+         (cx_of["process"], bot_of["process"])],
         sid, "Arrow Complete-Process Loop", CLR_NO, dash="dash",
-        tail="triangle", radius=R)))
+        tail="triangle", radius=R))
     sid += 1
 
     # ── Shapes (on top of arrows) ──
     for key, (text, preset, x, y, cx, cy, fill, border) in shapes.items():
         xml = make_shape_xml(sid, key, text, preset, x, y, cx, cy, fill, border)
-        spTree.append(etree.fromstring(xml))
+        frags.append(xml)
         sid += 1
 
     # ── YES/NO labels ──
     # "NO" label on Valid? → Reject (centered in gap above arrow)
-    gap_cx = right_of("valid") + (left_of("reject") - right_of("valid")) // 2
-    spTree.append(etree.fromstring(make_label_xml(
-        sid, "NO", gap_cx - 171450, cy_of("valid") - 300000, CLR_NO, 1200)))
+    gap_cx = right_of["valid"] + (left_of["reject"] - right_of["valid"]) // 2
+    frags.append(make_label_xml(
+        sid, "NO", gap_cx - 171450, cy_of["valid"] - 300000, CLR_NO, 1200))
     sid += 1
 
     # "YES" label on Valid? → Process (left of the down arrow, in row gap)
-    spTree.append(etree.fromstring(make_label_xml(
-        sid, "YES", cx_of("valid") + 100000, bot_of("valid") + 20000, CLR_YES, 1200)))
+    frags.append(make_label_xml(
+        sid, "YES", cx_of["valid"] + 100000, bot_of["valid"] + 20000, CLR_YES, 1200))
     sid += 1
 
     # "YES" label on Complete? → Done (centered in gap above arrow)
-    gap_cx2 = right_of("complete") + (left_of("done") - right_of("complete")) // 2
-    spTree.append(etree.fromstring(make_label_xml(
-        sid, "YES", gap_cx2 - 171450, cy_of("complete") - 300000, CLR_YES, 1200)))
+    gap_cx2 = right_of["complete"] + (left_of["done"] - right_of["complete"]) // 2
+    frags.append(make_label_xml(
+        sid, "YES", gap_cx2 - 171450, cy_of["complete"] - 300000, CLR_YES, 1200))
     sid += 1
 
     # "NO" label on Complete? loop-back (right of bottom exit)
-    spTree.append(etree.fromstring(make_label_xml(
-        sid, "NO", cx_of("complete") + 100000, bot_of("complete") + 20000, CLR_NO, 1200)))
+    frags.append(make_label_xml(
+        sid, "NO", cx_of["complete"] + 100000, bot_of["complete"] + 20000, CLR_NO, 1200))
     sid += 1
 
+    # One parse for every shape, then move them into the slide in z-order
+    shapes = etree.fromstring(_SHAPES_WRAPPER % "".join(frags))
+    spTree.extend(list(shapes))
+
     output = "branching_flowchart.pptx"
     prs.save(output)
     print(f"Saved: {os.path.abspath(output)}")
@@ -19,6 +19,7 @@ Run: pip install python-pptx lxml && python flowchart.py && open flowchart.pptx
 from pptx import Presentation
 from pptx.util import Emu
 from lxml import etree
+from functools import lru_cache
 import os
 
 SLIDE_W, SLIDE_H = 9144000, 5143500
@@ -42,100 +43,104 @@ LEFT = (SLIDE_W - total_w) // 2
 BASE_CY = 1143000  # tallest shape height (decision diamond)
 BASE_Y = (SLIDE_H - BASE_CY) // 2 + 114300  # shift down slightly to balance with title
 
+# Synthetic root for parsing every shape fragment in a single fromstring() call;
+# the fragments themselves carry no namespace declarations
+_SHAPES_WRAPPER = (
+    '<p:spTree xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+    ' xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">%s</p:spTree>'
+)
+
+
+# Gradient fill, outline and shadow for a (fill, border) pair; see _shape_style_xml
+_SHAPE_STYLE_TMPL = '''<a:gradFill>
+      <a:gsLst>
+        <a:gs pos="0"><a:srgbClr val="{fill}"/></a:gs>
+        <a:gs pos="100000"><a:srgbClr val="{border}"/></a:gs>
+      </a:gsLst>
+      <a:lin ang="5400000" scaled="0"/>
+    </a:gradFill>
+    <a:ln w="19050"><a:solidFill><a:srgbClr val="{border}"/></a:solidFill><a:round/></a:ln>
+    <a:effectLst>
+      <a:outerShdw blurRad="50800" dist="38100" dir="5400000" algn="tl" rotWithShape="0">
+        <a:srgbClr val="000000"><a:alpha val="35000"/></a:srgbClr>
+      </a:outerShdw>
+    </a:effectLst>'''.format
+
+
+@lru_cache(maxsize=None)
+def _shape_style_xml(fill, border):
+    """Style block for _SHAPE_TMPL, formatted once per color pair."""
+    return _SHAPE_STYLE_TMPL(fill=fill, border=border)
+
+
+# Shape with gradient fill, shadow and centered text
+_SHAPE_TMPL = '''<p:sp>
+  <p:nvSpPr>
+    <p:cNvPr id="{sid}" name="{name}"/>
+    <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
+    <p:nvPr/>
+  </p:nvSpPr>
+  <p:spPr>
+    <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
+    <a:prstGeom prst="{preset}"><a:avLst/></a:prstGeom>
+    {style_xml}
+  </p:spPr>
+  <p:txBody>
+    <a:bodyPr wrap="square" anchor="ctr"><a:normAutofit/></a:bodyPr>
+    <a:lstStyle/>
+    <a:p><a:pPr algn="ctr"/>
+      <a:r><a:rPr lang="en-US" sz="1400" b="1" dirty="0">
+        <a:solidFill><a:srgbClr val="FFFFFF"/></a:solidFill>
+        <a:latin typeface="Calibri"/>
+      </a:rPr><a:t>{text}</a:t></a:r>
+    </a:p>
+  </p:txBody>
+</p:sp>'''.format
+
 
 def make_shape_xml(sid, name, text, preset, x, y, cx, cy, fill, border):
     """Create a shape with gradient fill, shadow, and centered text."""
-    return f'''
-    <p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-          xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
-      <p:nvSpPr>
-        <p:cNvPr id="{sid}" name="{name}"/>
-        <p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>
-        <p:nvPr/>
-      </p:nvSpPr>
-      <p:spPr>
-        <a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>
-        <a:prstGeom prst="{preset}"><a:avLst/></a:prstGeom>
-        <a:gradFill>
-          <a:gsLst>
-            <a:gs pos="0"><a:srgbClr val="{fill}"/></a:gs>
-            <a:gs pos="100000"><a:srgbClr val="{border}"/></a:gs>
-          </a:gsLst>
-          <a:lin ang="5400000" scaled="0"/>
-        </a:gradFill>
-        <a:ln w="19050"><a:solidFill><a:srgbClr val="{border}"/></a:solidFill><a:round/></a:ln>
-        <a:effectLst>
-          <a:outerShdw blurRad="50800" dist="38100" dir="5400000" algn="tl" rotWithShape="0">
-            <a:srgbClr val="000000"><a:alpha val="35000"/></a:srgbClr>
-          </a:outerShdw>
-        </a:effectLst>
-      </p:spPr>
-      <p:txBody>
-        <a:bodyPr wrap="square" anchor="ctr"><a:normAutofit/></a:bodyPr>
-        <a:lstStyle/>
-        <a:p><a:pPr algn="ctr"/>
-          <a:r><a:rPr lang="en-US" sz="1400" b="1" dirty="0">
-            <a:solidFill><a:srgbClr val="FFFFFF"/></a:solidFill>
-            <a:latin typeface="Calibri"/>
-          </a:rPr><a:t>{text}</a:t></a:r>
-        </a:p>
-      </p:txBody>
-    </p:sp>'''
+    return _SHAPE_TMPL(
+        sid=sid, name=name, x=x, y=y, cx=cx, cy=cy, preset=preset,
+        style_xml=_shape_style_xml(fill, border), text=text)
 
 
-def build_routed_connector_xml(waypoints, sid, name="Connector",
-                                color="888888", width=19050,
-                                dash="solid", tail="triangle",
-                                head="none", radius=150000):
-    """Orthogonal connector with curved elbows using custom geometry."""
-    xs = [p[0] for p in waypoints]
-    ys = [p[1] for p in waypoints]
-    min_x, min_y = min(xs), min(ys)
-    max_x, max_y = max(xs), max(ys)
-    bbox_w = max(max_x - min_x, 1)
-    bbox_h = max(max_y - min_y, 1)
+# Path commands for build_routed_connector_xml (integer-only %-formatting)
+_MV = '<a:moveTo><a:pt x="%d" y="%d"/></a:moveTo>'
+_LN = '<a:lnTo><a:pt x="%d" y="%d"/></a:lnTo>'
+_ARC = '<a:arcTo wR="%d" hR="%d" stAng="%d" swAng="%d"/>'
 
-    pts = [(x - min_x, y - min_y) for x, y in waypoints]
+# Segment directions as ordinals: R=0, L=1, D=2, U=3
+_R, _L, _D, _U = range(4)
 
-    def direction(a, b):
-        dx, dy = b[0] - a[0], b[1] - a[1]
-        if dx > 0: return 'R'
-        if dx < 0: return 'L'
-        if dy > 0: return 'D'
-        return 'U'
-
-    ARC = {
-        ('R', 'D'): (16200000, 5400000),   ('R', 'U'): (5400000, -5400000),
-        ('L', 'D'): (16200000, -5400000),  ('L', 'U'): (5400000, 5400000),
-        ('D', 'R'): (10800000, -5400000),  ('D', 'L'): (0, 5400000),
-        ('U', 'R'): (10800000, 5400000),   ('U', 'L'): (0, -5400000),
-    }
-
-    path_cmds = [f'<a:moveTo><a:pt x="{pts[0][0]}" y="{pts[0][1]}"/></a:moveTo>']
-    for i in range(1, len(pts)):
-        if i < len(pts) - 1:
-            prev_dir = direction(pts[i-1], pts[i])
-            next_dir = direction(pts[i], pts[i+1])
-            seg_before = abs(pts[i][0]-pts[i-1][0]) + abs(pts[i][1]-pts[i-1][1])
-            seg_after = abs(pts[i+1][0]-pts[i][0]) + abs(pts[i+1][1]-pts[i][1])
-            r = min(radius, seg_before // 2, seg_after // 2)
-            bx, by = pts[i][0], pts[i][1]
-            if prev_dir == 'R': bx -= r
-            elif prev_dir == 'L': bx += r
-            elif prev_dir == 'D': by -= r
-            elif prev_dir == 'U': by += r
-            path_cmds.append(f'<a:lnTo><a:pt x="{bx}" y="{by}"/></a:lnTo>')
-            st, sw = ARC[(prev_dir, next_dir)]
-            path_cmds.append(f'<a:arcTo wR="{r}" hR="{r}" stAng="{st}" swAng="{sw}"/>')
-        else:
-            path_cmds.append(f'<a:lnTo><a:pt x="{pts[i][0]}" y="{pts[i][1]}"/></a:lnTo>')
+# Direction keyed by (sign dx, sign dy); horizontal wins on diagonals
+_DIR = {
+    (1, 0): _R, (1, 1): _R, (1, -1): _R,
+    (-1, 0): _L, (-1, 1): _L, (-1, -1): _L,
+    (0, 1): _D, (0, -1): _U, (0, 0): _U,
+}
 
-    path_data = ''.join(path_cmds)
-    head_xml = f'<a:headEnd type="{head}" w="med" len="med"/>' if head != "none" else '<a:headEnd type="none"/>'
-    tail_xml = f'<a:tailEnd type="{tail}" w="med" len="med"/>' if tail != "none" else '<a:tailEnd type="none"/>'
+# Unit step back along each direction, used to stop short of an elbow
+_BACK_DX = (-1, 1, 0, 0)
+_BACK_DY = (0, 0, -1, 1)
+
+# (stAng, swAng) of the elbow arc, flat 4x4 table indexed by
+# incoming * 4 + outgoing; None marks straight-through or reversing pairs
+_ARC_ANGLES = (
+    None, None, (16200000, 5400000), (5400000, -5400000),     # from R
+    None, None, (16200000, -5400000), (5400000, 5400000),     # from L
+    (10800000, -5400000), (0, 5400000), None, None,           # from D
+    (10800000, 5400000), (0, -5400000), None, None,           # from U
+)
 
-    return f'''<p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-       xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+
+def _direction(a, b):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    return _DIR[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))]
+
+
+# Routed connector; path_data holds the moveTo/lnTo/arcTo commands
+_CONN_TMPL = '''<p:sp>
   <p:nvSpPr>
     <p:cNvPr id="{sid}" name="{name}"/>
     <p:cNvSpPr/>
@@ -165,7 +170,51 @@ def build_routed_connector_xml(waypoints, sid, name="Connector",
     </a:ln>
   </p:spPr>
   <p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:endParaRPr lang="en-US" dirty="0"/></a:p></p:txBody>
-</p:sp>'''
+</p:sp>'''.format
+
+
+def build_routed_connector_xml(waypoints, sid, name="Connector",
+                                color="888888", width=19050,
+                                dash="solid", tail="triangle",
+                                head="none", radius=150000):
+    """Orthogonal connector with curved elbows using custom geometry."""
+    xs = [p[0] for p in waypoints]
+    ys = [p[1] for p in waypoints]
+    min_x, min_y = min(xs), min(ys)
+    max_x, max_y = max(xs), max(ys)
+    bbox_w = max(max_x - min_x, 1)
+    bbox_h = max(max_y - min_y, 1)
+
+    pts = [(x - min_x, y - min_y) for x, y in waypoints]
+
+    # Direction and half-length of each segment, computed once and shared by
+    # the elbows at both of its ends
+    n = len(pts)
+    dirs = [_direction(a, b) for a, b in zip(pts, pts[1:])]
+    halves = [(abs(b[0] - a[0]) + abs(b[1] - a[1])) // 2 for a, b in zip(pts, pts[1:])]
+
+    path_cmds = [None] * max(1, 2 * n - 2)
+    path_cmds[0] = _MV % pts[0]
+    j = 1
+    for i in range(1, n - 1):
+        prev_dir, next_dir = dirs[i-1], dirs[i]
+        r = min(radius, halves[i-1], halves[i])
+        st, sw = _ARC_ANGLES[prev_dir * 4 + next_dir]
+        path_cmds[j] = _LN % (pts[i][0] + _BACK_DX[prev_dir] * r,
+                              pts[i][1] + _BACK_DY[prev_dir] * r)
+        path_cmds[j + 1] = _ARC % (r, r, st, sw)
+        j += 2
+    if n > 1:  # a single waypoint is just the moveTo
+        path_cmds[j] = _LN % pts[-1]
+
+    path_data = ''.join(path_cmds)
+    head_xml = f'<a:headEnd type="{head}" w="med" len="med"/>' if head != "none" else '<a:headEnd type="none"/>'
+    tail_xml = f'<a:tailEnd type="{tail}" w="med" len="med"/>' if tail != "none" else '<a:tailEnd type="none"/>'
+
+    return _CONN_TMPL(
+        sid=sid, name=name, min_x=min_x, min_y=min_y, bbox_w=bbox_w, bbox_h=bbox_h,
+        path_data=path_data, width=width, color=color, dash=dash,
+        head_xml=head_xml, tail_xml=tail_xml)
 
 
 def main():
@@ -177,9 +226,7 @@ def main():
     sid = 2
 
     # Background
-    bg_xml = f'''
-    <p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-          xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+    bg_xml = f'''<p:sp>
       <p:nvSpPr><p:cNvPr id="{sid}" name="Background"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
       <p:spPr>
         <a:xfrm><a:off x="0" y="0"/><a:ext cx="{SLIDE_W}" cy="{SLIDE_H}"/></a:xfrm>
@@ -195,13 +242,11 @@ def main():
       </p:spPr>
       <p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:endParaRPr lang="en-US" dirty="0"/></a:p></p:txBody>
     </p:sp>'''
-    spTree.insert(2, etree.fromstring(bg_xml.strip()))
+    frags = [bg_xml]
     sid += 1
 
     # Title
-    title_xml = f'''
-    <p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-          xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+    title_xml = f'''<p:sp>
       <p:nvSpPr><p:cNvPr id="{sid}" name="Title"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
       <p:spPr>
         <a:xfrm><a:off x="457200" y="228600"/><a:ext cx="8229600" cy="457200"/></a:xfrm>
@@ -219,7 +264,7 @@ def main():
         </a:p>
       </p:txBody>
     </p:sp>'''
-    spTree.append(etree.fromstring(title_xml.strip()))
+    frags.append(title_xml)
     sid += 1
 
     # Compute shape positions
@@ -238,21 +283,19 @@ def main():
         xml = build_routed_connector_xml(
             [(ax, ay), (bx, ay)], sid, f"Arrow {sid}",
             color="4472C4", width=25400, tail="triangle")
-        spTree.append(etree.fromstring(xml))
+        frags.append(xml)
         sid += 1
 
     # Shapes (on top of arrows)
     for i, (text, preset, fill, border) in enumerate(STEPS):
         x, y, cx, cy = shape_rects[i]
         xml = make_shape_xml(sid, text, text, preset, x, y, cx, cy, fill, border)
-        spTree.append(etree.fromstring(xml.strip()))
+        frags.append(xml)
         sid += 1
 
     # "YES" label near Review decision
     review_x = shape_rects[2][0]
-    label_xml = f'''
-    <p:sp xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"
-          xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+    label_xml = f'''<p:sp>
       <p:nvSpPr><p:cNvPr id="{sid}" name="YesLabel"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr><p:nvPr/></p:nvSpPr>
       <p:spPr>
         <a:xfrm><a:off x="{review_x + SW + GAP // 4}" y="{BASE_Y - 228600}"/><a:ext cx="457200" cy="342900"/></a:xfrm>
@@ -270,7 +313,11 @@ def main():
         </a:p>
       </p:txBody>
     </p:sp>'''
-    spTree.append(etree.fromstring(label_xml.strip()))
+    frags.append(label_xml)
+
+    # One parse for every shape, then move them into the slide in z-order
+    shapes = etree.fromstring(_SHAPES_WRAPPER % "".join(frags))
+    spTree.extend(list(shapes))
 
     output = "flowchart.pptx"
     prs.save(output)
@@ -23,12 +23,20 @@ if IS_WINDOWS:
         win32com = None
 
 
+def _applescript_str(value) -> str:
+    """Quote a value as an AppleScript string literal."""
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
 def _convert_to_pdf_macos(input_path: Path, pdf_path: Path) -> None:
     script = f'''
+    set inFile to POSIX file {_applescript_str(input_path)}
+    set outFile to POSIX file {_applescript_str(pdf_path)}
     tell application "Microsoft PowerPoint"
-        open POSIX file "{input_path}"
+        open inFile
         set thePresentation to active presentation
-        save thePresentation in POSIX file "{pdf_path}" as save as PDF
+        save thePresentation in outFile as save as PDF
         close thePresentation
     end tell
     '''
@@ -23,14 +23,22 @@ if IS_WINDOWS:
         win32com = None
 
 
+def _applescript_str(value) -> str:
+    """Quote a value as an AppleScript string literal."""
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
 def _convert_to_pdf_macos(input_path: Path, pdf_path: Path) -> None:
     script = f'''
+    set inFile to POSIX file {_applescript_str(input_path)}
+    set outPath to {_applescript_str(pdf_path)}
     tell application "Microsoft Excel"
         activate
-        open POSIX file "{input_path}"
+        open inFile
         delay 1
         set theWorkbook to active workbook
-        save as (active sheet of theWorkbook) filename "{pdf_path}" file format PDF file format
+        save as (active sheet of theWorkbook) filename outPath file format PDF file format
         close theWorkbook saving no
     end tell
     '''